@@ -1,9 +1,18 @@
 """
 fetchr - Multi-host file download library
 """
-from .main import Downloader, SUPPORTED_HOSTS
-from .concurrency_manager import ConcurrencyManager
-from .health import HealthChecker, health, async_health
+import importlib
+
+# Exports are imported on first access (PEP 562) so `import fetchr` doesn't
+# pull aria2p, aiohttp and the hosts config until they are actually needed
+_LAZY_EXPORTS = {
+    "Downloader": ".main",
+    "SUPPORTED_HOSTS": ".main",
+    "ConcurrencyManager": ".concurrency_manager",
+    "HealthChecker": ".health",
+    "health": ".health",
+    "async_health": ".health",
+}
 
 __all__ = [
     "Downloader",
@@ -13,3 +22,16 @@ __all__ = [
     "health",
     "async_health",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
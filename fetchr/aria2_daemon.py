@@ -1,84 +1,211 @@
 import aria2p
 import logging
 import asyncio
-from typing import List, Optional, Callable
+import os
+from typing import Dict, List, Optional, Callable
 from pathlib import Path
+from fetchr.config import CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait between RPC probes while a freshly spawned aria2c starts up
+STARTUP_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+SAVE_SESSION_INTERVAL = 30
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return _pid_alive_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _pid_alive_windows(pid: int) -> bool:
+    # os.kill(pid, 0) would call TerminateProcess on Windows: query the process instead
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    ERROR_ACCESS_DENIED = 5
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Exists but belongs to someone else; any other error means no such process
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return False
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
 class Aria2DaemonManager:
     """
     Manages the Aria2c daemon process and JSON-RPC connection using aria2p.
     """
-    def __init__(self, host="http://127.0.0.1", port=6800, secret="", download_dir: Path = None):
+    def __init__(self, host="http://127.0.0.1", port=6800, secret="", download_dir: Path = None,
+                 log_path: Optional[Path] = Path("aria2_std.log"),
+                 session_path: Path = CACHE_DIR / "aria2.session"):
         self.host = host
         self.port = port
         self.secret = secret
         self.api: Optional[aria2p.API] = None
         self.download_dir = download_dir
+        # aria2c stdout/stderr go here; None discards them
+        self.log_path = log_path
+        # aria2c session file, so unfinished downloads resume on the next start
+        self.session_path = Path(session_path)
+        self.pid_path = self.session_path.with_suffix(".pid")
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        # aria2p Download objects by GID
+        self._downloads: Dict[str, aria2p.Download] = {}
+        self._log_file = None
 
     async def initialize(self):
         """
         Initialize the connection to Aria2c. 
         Tries to connect to an existing daemon, or starts a new one if not found.
         """
+        loop = asyncio.get_running_loop()
         try:
-            # Try connecting first
-            self.api = aria2p.API(
-                aria2p.Client(
-                    host=self.host,
-                    port=self.port,
-                    secret=self.secret
-                )
-            )
-            self.api.get_global_options()
+            # Try connecting first (aria2p does blocking JSON-RPC, keep it off the loop)
+            self.api = await loop.run_in_executor(None, self._connect)
             logger.info("✅ Connected to existing Aria2c daemon")
+            return
         except Exception:
-            logger.info("⚠️ Aria2c daemon not found. Starting new instance...")
-            # If connection fails, try to start a new instance
-            # Note: aria2c must be in PATH
-            cmd = [
-                "aria2c",
-                "--enable-rpc",
-                f"--rpc-listen-port={self.port}",
-                "--rpc-allow-origin-all",
-                "--interface=127.0.0.1",
-                f"--dir={str(self.download_dir.resolve())}" if self.download_dir else "",
-                # Remove --daemon so we can control the process via asyncio
-                # "--daemon=true" 
-            ]
-            if self.secret:
-                cmd.append(f"--rpc-secret={self.secret}")
-            
-            logger.info(f"Starting aria2c: {' '.join(cmd)}")
-            
-            # Start process without waiting for it to finish
+            pass
+        
+        # A daemon spawned by another run may still be starting up: wait for it
+        pid = self._read_pid()
+        if pid is not None:
+            logger.info(f"⏳ Waiting for Aria2c daemon (pid {pid}) to come up...")
+            if await self._wait_until_ready(lambda: not _pid_alive(pid)):
+                logger.info("✅ Connected to existing Aria2c daemon")
+                return
+        
+        logger.info("⚠️ Aria2c daemon not found. Starting new instance...")
+        # Note: aria2c must be in PATH
+        cmd = [
+            "aria2c",
+            "--enable-rpc",
+            f"--rpc-listen-port={self.port}",
+            "--rpc-allow-origin-all",
+            "--rpc-listen-all=false",
+            "--interface=127.0.0.1",
+            # Downloads survive restarts: state is saved periodically and on exit
+            f"--save-session={self.session_path}",
+            f"--save-session-interval={SAVE_SESSION_INTERVAL}",
+            # Remove --daemon so we can control the process via asyncio
+            # "--daemon=true" 
+        ]
+        if self.session_path.exists():
+            cmd.append(f"--input-file={self.session_path}")
+        if self.download_dir:
+            cmd.append(f"--dir={str(self.download_dir.resolve())}")
+        if self.secret:
+            cmd.append(f"--rpc-secret={self.secret}")
+        
+        logger.info(f"Starting aria2c: {' '.join(cmd)}")
+        
+        # Start process without waiting for it to finish
+        try:
+            self.session_path.parent.mkdir(parents=True, exist_ok=True)
+            # The child writes straight to the file descriptor, so no
+            # Python-side buffering is involved; DEVNULL avoids the file entirely
+            if self.log_path is not None:
+                self._log_file = open(self.log_path, "wb", buffering=0)
+                output = self._log_file
+            else:
+                output = asyncio.subprocess.DEVNULL
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=output,
+                stderr=output
+            )
+            self._proc = proc # Keep reference
+            self.pid_path.write_text(str(proc.pid))
+        except Exception as e:
+            logger.error(f"Failed to launch aria2c: {e}")
+            await self.shutdown()
+            raise
+
+        # Poll until the RPC server answers instead of a fixed sleep
+        if not await self._wait_until_ready(lambda: proc.returncode is not None):
+            returncode = proc.returncode
+            await self.shutdown()
+            if returncode is not None:
+                raise RuntimeError(f"aria2c exited during startup with code {returncode}")
+            raise RuntimeError(f"aria2c did not answer on port {self.port} after startup")
+        logger.info("✅ Started and connected to new Aria2c daemon")
+
+    async def _wait_until_ready(self, is_dead: Callable[[], bool]) -> bool:
+        """Probe the RPC port with backoff until it answers or is_dead() is true"""
+        loop = asyncio.get_running_loop()
+        for delay in STARTUP_POLL_DELAYS:
+            await asyncio.sleep(delay)
+            if is_dead():
+                return False
             try:
-                # Open log file for debugging
-                log_file = open("aria2_std.log", "w")
-                proc = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=log_file,
-                    stderr=log_file
-                )
-                self._proc = proc # Keep reference
-                self._log_file = log_file
-            except Exception as e:
-                logger.error(f"Failed to launch aria2c: {e}")
-                raise
-
-            # Allow some time for startup
-            await asyncio.sleep(3)
-            
-            # Retry connection
-            self.api = aria2p.API(
-                aria2p.Client(
-                    host=self.host,
-                    port=self.port,
-                    secret=self.secret
-                )
+                self.api = await loop.run_in_executor(None, self._connect)
+                return True
+            except Exception:
+                continue
+        return False
+
+    def _read_pid(self) -> Optional[int]:
+        """PID of a daemon we spawned earlier, if it is still running"""
+        try:
+            pid = int(self.pid_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return pid if _pid_alive(pid) else None
+
+    async def shutdown(self, timeout: float = 5.0):
+        """Stop the aria2c process started by initialize() and close its log file"""
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            if proc.returncode is None:
+                proc.terminate()
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+            try:
+                self.pid_path.unlink()
+            except OSError:
+                pass
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        self.api = None
+        self._downloads.clear()
+
+    def _connect(self) -> aria2p.API:
+        """Create the aria2p API and check the daemon answers. Blocking"""
+        api = aria2p.API(
+            aria2p.Client(
+                host=self.host,
+                port=self.port,
+                secret=self.secret
             )
-            logger.info("✅ Started and connected to new Aria2c daemon")
+        )
+        api.get_global_options()
+        return api
 
     def add_download(self, url: str, options: dict = None) -> str:
         """
@@ -88,28 +215,63 @@ class Aria2DaemonManager:
             raise RuntimeError("Aria2 API not initialized. Call initialize() first.")
         
         downloads = self.api.add(url, options=options)
-        return downloads[0].gid
+        download = downloads[0]
+        # Keep the Download object so later actions don't need a tellStatus first
+        self._downloads[download.gid] = download
+        return download.gid
+
+    def _get_download(self, gid: str) -> aria2p.Download:
+        download = self._downloads.get(gid)
+        if download is None:
+            download = self._downloads[gid] = self.api.get_download(gid)
+        return download
 
     def get_status(self, gid: str):
         if not self.api:
             return None
         try:
-            return self.api.get_download(gid)
+            download = self._downloads[gid] = self.api.get_download(gid)
+            return download
         except Exception:
             return None
+
+    def get_statuses(self, gids: List[str]) -> Dict[str, Optional[aria2p.Download]]:
+        """
+        Fresh status for several downloads in a single JSON-RPC multicall.
+        Unknown GIDs map to None.
+        """
+        if not self.api or not gids:
+            return {gid: None for gid in gids}
+        client = self.api.client
+        try:
+            results = client.multicall2([(client.TELL_STATUS, [gid]) for gid in gids])
+        except Exception:
+            return {gid: self.get_status(gid) for gid in gids}
+        
+        statuses = {}
+        for gid, result in zip(gids, results):
+            # Successful calls come back wrapped in a list, failures as a fault dict
+            if isinstance(result, list) and result:
+                download = self._downloads[gid] = aria2p.Download(self.api, result[0])
+                statuses[gid] = download
+            else:
+                self._downloads.pop(gid, None)
+                statuses[gid] = None
+        return statuses
     
     def pause(self, gid: str):
         if self.api:
-            self.api.get_download(gid).pause()
+            self._get_download(gid).pause()
             
     def resume(self, gid: str):
         if self.api:
-            self.api.get_download(gid).unpause()
+            self._get_download(gid).unpause()
 
     def remove(self, gid: str, force=False):
         if self.api:
-            d = self.api.get_download(gid)
+            d = self._get_download(gid)
             d.remove(force=force)
+            self._downloads.pop(gid, None)
 
     def listen_to_notifications(self, on_change: Callable):
         """
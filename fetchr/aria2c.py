@@ -1,11 +1,114 @@
 from pathlib import Path
 import asyncio
-import aiofiles
+import errno
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from fetchr.network import get_random_proxy
 from fetchr.types import DownloadInfo
 
+logger = logging.getLogger(__name__)
+
+# Errors that mean the kernel can't do the copy for this pair of files
+# (old kernel, cross-filesystem, unsupported fs, non-Linux sendfile...)
+_KERNEL_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK}
+_FALLBACK_CHUNK_SIZE = 1024 * 1024
+ASSEMBLE_MAX_WORKERS = 8
+# Below this total size parts are concatenated in memory with a single write
+SMALL_ASSEMBLY_THRESHOLD = 64 * 1024 * 1024
+
+
+def _copy_chunk(fd_in: int, fd_out: int, count: int) -> int:
+    """Copy up to count bytes from fd_in to fd_out, in kernel space when possible"""
+    if hasattr(os, "copy_file_range"):
+        try:
+            return os.copy_file_range(fd_in, fd_out, count)
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            return os.sendfile(fd_out, fd_in, None, count)
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+    data = os.read(fd_in, min(count, _FALLBACK_CHUNK_SIZE))
+    view = memoryview(data)
+    while view:
+        written = os.write(fd_out, view)
+        view = view[written:]
+    return len(data)
+
+
+def _preallocate(output_path: Path, size: int) -> None:
+    """Create (or truncate) output_path and reserve size bytes for it"""
+    fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError as e:
+                if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                    raise
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def _copy_part_at(output_path: Path, part_path: Path, offset: int, size: int) -> int:
+    """Copy size bytes of a part file into output_path starting at offset. Returns bytes copied"""
+    fd_in = os.open(part_path, os.O_RDONLY)
+    try:
+        # Each worker gets its own output fd so file positions don't collide
+        fd_out = os.open(output_path, os.O_WRONLY)
+        try:
+            os.lseek(fd_out, offset, os.SEEK_SET)
+            remaining = size
+            while remaining > 0:
+                copied = _copy_chunk(fd_in, fd_out, remaining)
+                if copied == 0:
+                    raise Exception(f"Unexpected end of part file: {part_path}")
+                remaining -= copied
+            return size
+        finally:
+            os.close(fd_out)
+    finally:
+        os.close(fd_in)
+
+
+def _place_part(output_path: Path, part_path: Path, offset: int, size: int) -> int:
+    """Copy a finished part into the preallocated output at offset, then delete it"""
+    part_size = os.stat(part_path).st_size
+    if part_size != size:
+        raise Exception(f"Size mismatch in {part_path}: expected {size:,} bytes, got {part_size:,} bytes")
+    copied = _copy_part_at(output_path, part_path, offset, size)
+    os.remove(part_path)
+    return copied
+
+
+def _assemble_in_memory(output_path: Path, part_paths: list, total_size: int) -> int:
+    """Read every part into one preallocated buffer and write it out at once. Returns bytes written"""
+    buf = bytearray(total_size)
+    view = memoryview(buf)
+    offset = 0
+    for part_path in part_paths:
+        with open(part_path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(view[offset:])
+                if not n:
+                    break
+                offset += n
+    if offset != total_size:
+        raise Exception(f"Parts changed during assembly: expected {total_size:,} bytes, read {offset:,} bytes")
+    with open(output_path, "wb", buffering=0) as out:
+        written = 0
+        while written < total_size:
+            written += out.write(view[written:])
+    return written
+
+
 class Aria2cDownloader():
     async def download_with_multithread(
         self,
@@ -18,44 +121,67 @@ class Aria2cDownloader():
         use_random_proxy: bool = False
     ) -> Optional[str]:
         size_part = download_info.size // use_connections
-        tasks = []
+        parts = []
         
         for i in range(use_connections):
             start_byte = i * size_part
-            end_byte = start_byte + size_part - 1
+            if i == use_connections - 1:  # Last part gets remaining bytes
+                end_byte = download_info.size - 1
+            else:
+                end_byte = start_byte + size_part - 1
             
             headers = {
                 "Range": f"bytes={start_byte}-{end_byte}"
             }
             
             part_path = output_path.with_suffix(f".aria2c.part{i}")
-            
-            task = asyncio.create_task(self.download(
+            parts.append((part_path, headers, start_byte, end_byte - start_byte + 1))
+        
+        # Big files: every part's offset is known up front, so copy each one into the
+        # preallocated output as soon as it finishes instead of assembling at the end
+        stream_parts = download_info.size >= SMALL_ASSEMBLY_THRESHOLD
+        loop = asyncio.get_running_loop()
+        if stream_parts:
+            await loop.run_in_executor(None, _preallocate, output_path, download_info.size)
+        
+        async def download_part(part_path: Path, headers: dict, offset: int, size: int):
+            await self.download(
                 download_info, 
                 part_path, 
                 headers,
                 ignore_ssl, 
                 use_random_proxy=use_random_proxy
-            ))
-            tasks.append(task)
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*[task for task, _ in tasks], return_exceptions=True)
+            )
+            if stream_parts:
+                await loop.run_in_executor(None, _place_part, output_path, part_path, offset, size)
+        
+        # Wait for all parts to complete (gather cancels every part if we are cancelled)
+        results = await asyncio.gather(
+            *[download_part(*part) for part in parts],
+            return_exceptions=True
+        )
         
         # Check for errors and retry if needed
-        failed_tasks = []
-        import traceback
+        failed_parts = []
         for i, result in enumerate(results):
             if isinstance(result, Exception):
-                print(f"❌ Part {i} failed: {result}")
-                traceback.print_exception(type(result), result, result.__traceback__)
-                failed_tasks.append(tasks[i][1])  # Get the function to retry
-        if failed_tasks:
+                logger.error("❌ Part %d failed: %s", i, result, exc_info=result)
+                failed_parts.append(i)
+        if failed_parts:
             print("🔄 Retrying failed parts...")
-            retry_tasks = [asyncio.create_task(func()) for func in failed_tasks]
-            await asyncio.gather(*retry_tasks, return_exceptions=True)
+            retry_results = await asyncio.gather(
+                *[download_part(*parts[i]) for i in failed_parts],
+                return_exceptions=True
+            )
+            for i, result in zip(failed_parts, retry_results):
+                if isinstance(result, Exception):
+                    raise Exception(f"Part {i} failed after retry: {result}") from result
         
-        # Assemble all parts into final file
-        await self._assemble_parts(output_path, use_connections, download_info.size)
+        if stream_parts:
+            print(f"✅ Final file assembled: {output_path} ({download_info.size:,} bytes)")
+        else:
+            # Assemble all parts into final file
+            await self._assemble_parts(output_path, use_connections, download_info.size)
         
         return output_path
 
@@ -85,7 +211,8 @@ class Aria2cDownloader():
             proxy=proxy,
             download_info=download_info,
         )
-        print(f"cmd: {' '.join(cmd)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("cmd: %s", ' '.join(cmd))
         process = await asyncio.create_subprocess_exec(
             *cmd,
         )
@@ -120,7 +247,7 @@ class Aria2cDownloader():
             f"-x", str(max_connections), # max connections
             f"-s", str(use_connections), # splited parts
             #f"-j", str(max_concurrent_downloads), # max concurrent downloads
-            "-o", str(download_info.filename),
+            "-o", output_path.name,
             f"--max-tries={max_tries}",
             "--retry-wait=1",
         ]
@@ -145,14 +272,22 @@ class Aria2cDownloader():
         """Assemble all part files into final file with size validation"""
         print(f"🔧 Assembling {part_count} parts into final file...")
         
-        # Validate all parts exist and calculate total size
+        # Validate all parts exist and calculate total size / offsets
+        # One os.stat per part doubles as the existence check
+        part_paths = []
+        part_sizes = []
+        offsets = []
         total_size = 0
         for i in range(part_count):
-            part_path = output_path.with_suffix(f".aria2c.part{i}")
-            if not part_path.exists():
+            part_path = os.fspath(output_path.with_suffix(f".aria2c.part{i}"))
+            try:
+                part_size = os.stat(part_path).st_size
+            except FileNotFoundError:
                 raise Exception(f"Missing part file: {part_path}")
             
-            part_size = part_path.stat().st_size
+            part_paths.append(part_path)
+            part_sizes.append(part_size)
+            offsets.append(total_size)
             total_size += part_size
             print(f"📁 Part {i}: {part_size:,} bytes")
         
@@ -162,25 +297,24 @@ class Aria2cDownloader():
         
         print(f"📊 Total size: {total_size:,} bytes")
         
-        # Assemble the file
-        async with aiofiles.open(output_path, 'wb') as final_file:
-            for i in range(part_count):
-                part_path = output_path.with_suffix(f".part{i}")
-                
-                async with aiofiles.open(part_path, 'rb') as part_file:
-                    while True:
-                        chunk = await part_file.read(8192)
-                        if not chunk:
-                            break
-                        await final_file.write(chunk)
-                
-                # Remove part file after copying
-                os.remove(part_path)
-                print(f"✅ Assembled part {i}")
+        loop = asyncio.get_running_loop()
+        if total_size < SMALL_ASSEMBLY_THRESHOLD:
+            # Small file: syscall count dominates, so one read per part and a single write
+            copied = [await loop.run_in_executor(None, _assemble_in_memory, output_path, part_paths, total_size)]
+        else:
+            # Assemble the file: preallocate, then copy every part at its own offset in parallel
+            await loop.run_in_executor(None, _preallocate, output_path, total_size)
+            with ThreadPoolExecutor(max_workers=min(ASSEMBLE_MAX_WORKERS, part_count)) as pool:
+                copied = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _copy_part_at, output_path, part_path, offset, part_size)
+                    for part_path, offset, part_size in zip(part_paths, offsets, part_sizes)
+                ])
         
-        # Verify final file size
-        final_size = output_path.stat().st_size
-        if final_size != total_size:
-            raise Exception(f"Final file size mismatch: expected {total_size:,} bytes, got {final_size:,} bytes")
+        # Remove part files only once the whole file is assembled
+        for part_path in part_paths:
+            os.remove(part_path)
+        print(f"✅ Assembled {part_count} parts")
         
+        # Both paths raise on a short part, so the copied total is the final size
+        final_size = sum(copied)
         print(f"✅ Final file assembled: {output_path} ({final_size:,} bytes)")
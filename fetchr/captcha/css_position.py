@@ -1,17 +1,43 @@
 import re
+from collections import OrderedDict
 from bs4 import Tag
 
+_PAD_RE = re.compile(r'padding-left:\s*(\d+)\s*px')
 
-def solve_css_position_captcha(captcha_element: Tag) -> str:
+# Solved codes by captcha markup, so a retry against the same challenge
+# doesn't walk the spans again
+_CACHE_SIZE = 512
+_solved: 'OrderedDict[str, str]' = OrderedDict()
+
+
+def _solve(captcha_element: Tag) -> str:
     data = []
-    
+    append = data.append
+    search = _PAD_RE.search
+
     for span in captcha_element.find_all('span'):
-        number = span.get_text().strip()
-        style = span.get('style', '')
-        match = re.search(r'padding-left:(\d+)px', style)
-        
-        if match and number.isdigit():
-            data.append((int(match.group(1)), number))
-    
-    data.sort()
+        style = span.get('style')
+        if not style:
+            continue
+        match = search(style)
+        if match is None:
+            continue
+        number = span.get_text(strip=True)
+        if number.isdigit():
+            append((int(match.group(1)), number))
+
+    data.sort(key=lambda item: item[0])
     return ''.join([num for pos, num in data])
+
+
+def solve_css_position_captcha(captcha_element: Tag) -> str:
+    key = str(captcha_element)
+    code = _solved.get(key)
+    if code is not None:
+        _solved.move_to_end(key)
+        return code
+    code = _solve(captcha_element)
+    _solved[key] = code
+    if len(_solved) > _CACHE_SIZE:
+        _solved.popitem(last=False)
+    return code
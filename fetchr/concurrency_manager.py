@@ -2,14 +2,20 @@
 Concurrency Manager for controlling download limits per host
 """
 import asyncio
-from collections import defaultdict
-from urllib.parse import urlparse
+import aiohttp
 from typing import Dict, Optional, List, Any
 from pathlib import Path
 from rich.console import Console
 from fetchr.main import Downloader
 console = Console()
 
+
+def _canon(host: str) -> str:
+    """Canonical form of a host: lowercase, without leading 'www.'"""
+    host = host.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
 class ConcurrencyManager:
     """Manages download concurrency limits per host"""
     
@@ -41,9 +47,16 @@ class ConcurrencyManager:
             host: asyncio.Semaphore(limit) 
             for host, limit in self.host_limits.items()
         }
+        # host -> semaphore lookup, memoized on first resolution
+        self._exact = dict(self.host_semaphores)
+        
+        # Track active downloads per host: counters live in a list, indexed by
+        # a slot assigned the first time a host is seen
+        self._host_index: Dict[str, int] = {}
+        self._active_counts: List[int] = []
         
-        # Track active downloads per host
-        self.active_downloads = defaultdict(int)
+        # HTTP session shared by every download, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Statistics
         self.total_downloads = 0
@@ -52,28 +65,92 @@ class ConcurrencyManager:
     
     def get_semaphore(self, host: str) -> asyncio.Semaphore:
         """Get the appropriate semaphore for a host"""
-        # Clean host name
-        if host.startswith('www.'):
-            host = host[4:]
+        # Hosts from get_host_from_url are already canonical and usually cached
+        semaphore = self._exact.get(host)
+        if semaphore is not None:
+            return semaphore
         
-        # Find matching semaphore
-        for host_key, semaphore in self.host_semaphores.items():
-            if host_key in host or host in host_key:
-                return semaphore
+        host = _canon(host)
+        semaphore = self._exact.get(host)
+        if semaphore is not None:
+            return semaphore
         
-        # Return default if no match found
-        return self.host_semaphores["default"]
+        # Try registered domain (sub.example.com -> example.com)
+        parts = host.rsplit('.', 2)
+        semaphore = self._exact.get('.'.join(parts[-2:])) if len(parts) > 2 else None
+        
+        if semaphore is None:
+            # Last resort: substring scan, default if no match found
+            semaphore = self.host_semaphores["default"]
+            for host_key, candidate in self.host_semaphores.items():
+                if host_key in host or host in host_key:
+                    semaphore = candidate
+                    break
+        
+        self._exact[host] = semaphore
+        return semaphore
+    
+    @property
+    def active_downloads(self) -> Dict[str, int]:
+        """Active downloads per host (built on demand)"""
+        counts = self._active_counts
+        return {host: counts[i] for host, i in self._host_index.items()}
+    
+    def _host_slot(self, host: str) -> int:
+        """Index of the host's active-download counter"""
+        slot = self._host_index.get(host)
+        if slot is None:
+            slot = self._host_index[host] = len(self._active_counts)
+            self._active_counts.append(0)
+        return slot
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it if needed"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                # Match the largest host semaphore so the pool never is the bottleneck
+                limit_per_host=max(self.host_limits.values()),
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def aclose(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
     
     def get_host_from_url(self, url: str) -> str:
-        """Extract host from URL"""
-        parsed_url = urlparse(url)
-        host = parsed_url.netloc
-        if host.startswith('www.'):
-            host = host[4:]
-        return host
+        """Extract canonical host from URL"""
+        # Only the netloc is needed, so skip the full urlparse split
+        start = url.find('://')
+        start = start + 3 if start >= 0 else 0
+        end = len(url)
+        for sep in '/?#':
+            i = url.find(sep, start, end)
+            if i >= 0:
+                end = i
+        host = url[start:end]
+        at = host.rfind('@')
+        if at >= 0:
+            host = host[at + 1:]
+        colon = host.rfind(':')
+        if colon >= 0 and ']' not in host[colon:]:
+            host = host[:colon]
+        return _canon(host)
     
     async def download_with_limit(self, downloader: Downloader, url: str, download_dir: Path, 
-                                callback_progress=None, solve_captcha=None) -> Any:
+                                callback_progress=None, solve_captcha=None,
+                                host: Optional[str] = None,
+                                semaphore: Optional[asyncio.Semaphore] = None) -> Any:
         """
         Download a file respecting host concurrency limits
         
@@ -83,20 +160,28 @@ class ConcurrencyManager:
             download_dir: Directory to save file
             callback_progress: Progress callback function
             solve_captcha: Captcha solving function
+            host: Host of the URL, if already known
+            semaphore: Semaphore for the host, if already resolved
             
         Returns:
             Download result
         """
-        host = self.get_host_from_url(url)
-        semaphore = self.get_semaphore(host)
+        if host is None:
+            host = self.get_host_from_url(url)
+        if semaphore is None:
+            semaphore = self.get_semaphore(host)
+        
+        slot = self._host_slot(host)
+        counts = self._active_counts
         
         async with semaphore:
-            self.active_downloads[host] += 1
+            counts[slot] += 1
             self.total_downloads += 1
             
             try:
                 result = await downloader.download_file(
-                    url, download_dir, callback_progress, solve_captcha
+                    url, download_dir, callback_progress, solve_captcha,
+                    session=self._get_session()
                 )
                 self.successful_downloads += 1
                 return result
@@ -106,7 +191,7 @@ class ConcurrencyManager:
                 raise e
                 
             finally:
-                self.active_downloads[host] -= 1
+                counts[slot] -= 1
     
     async def download_multiple_files(self, downloader, urls: List[str], download_dir: Path,
                                     callback_progress=None, solve_captcha=None) -> List[Any]:
@@ -128,18 +213,23 @@ class ConcurrencyManager:
         
         console.print(f"📥 Iniciando descarga de {len(urls)} archivos")
         
-        # Create download tasks
-        tasks = []
+        # Resolve host and semaphore once per distinct host in the batch
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        downloads = []
         for url in urls:
-            task = asyncio.create_task(
+            host = self.get_host_from_url(url)
+            semaphore = semaphores.get(host)
+            if semaphore is None:
+                semaphore = semaphores[host] = self.get_semaphore(host)
+            downloads.append(
                 self.download_with_limit(
-                    downloader, url, download_dir, callback_progress, solve_captcha
+                    downloader, url, download_dir, callback_progress, solve_captcha,
+                    host=host, semaphore=semaphore
                 )
             )
-            tasks.append(task)
         
-        # Execute all downloads
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Execute all downloads (gather cancels every download if we are cancelled)
+        results = await asyncio.gather(*downloads, return_exceptions=True)
         
         # Filter successful downloads
         successful_downloads = []
@@ -159,7 +249,7 @@ class ConcurrencyManager:
             "successful_downloads": self.successful_downloads,
             "failed_downloads": self.failed_downloads,
             "success_rate": (self.successful_downloads / max(self.total_downloads, 1)) * 100,
-            "active_downloads": dict(self.active_downloads),
+            "active_downloads": self.active_downloads,
             "host_limits": self.host_limits
         }
     
@@ -182,12 +272,13 @@ class ConcurrencyManager:
         """Update concurrency limit for a specific host"""
         self.host_limits[host] = new_limit
         self.host_semaphores[host] = asyncio.Semaphore(new_limit)
+        self._exact = dict(self.host_semaphores)
         console.print(f"🔧 Límite actualizado para {host}: {new_limit}")
     
     async def monitor_downloads(self, interval: float = 5.0):
         """Monitor active downloads (for debugging)"""
         while True:
-            active_count = sum(self.active_downloads.values())
+            active_count = sum(self._active_counts)
             if active_count > 0:
                 for host, count in self.active_downloads.items():
                     if count > 0:
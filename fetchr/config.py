@@ -30,6 +30,7 @@ def get_env_or_default(key: str, default: str) -> str:
 # Directories
 CAPTCHAS_DIR = get_env_or_default("FETCHR_CAPTCHAS_DIR", str(ROOT_DIR / ".cache" / "fetchr" / "captchas"))
 DOWNLOAD_DIR = get_env_or_default("FETCHR_DOWNLOAD_DIR", str(ROOT_DIR / ".cache" / "fetchr" / "downloads"))
+CACHE_DIR = Path(get_env_or_default("FETCHR_CACHE_DIR", str(ROOT_DIR / ".cache" / "fetchr")))
 
 # Create directories
 try:
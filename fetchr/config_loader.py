@@ -2,10 +2,21 @@
 Cargador de configuración YAML para hosts
 """
 import os
+import hashlib
 import importlib
+import pickle
+import struct
+import sys
 from pathlib import Path
 from typing import Dict, Any, Type
 import yaml
+from fetchr.config import CACHE_DIR
+
+# libyaml es mucho más rápido; si PyYAML se instaló sin él usamos el loader en Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 # Mapeo de nombres de resolver a módulos
 # Formato: "NombreResolver": "nombre_modulo"
@@ -33,6 +44,44 @@ RESOLVER_MODULE_MAP = {
 _RESOLVER_CACHE: Dict[str, Type] = {}
 
 
+class _LazyResolver:
+    """
+    Referencia a un resolver que se importa en el primer uso.
+    
+    Se comporta como la clase: llamarlo crea una instancia y los atributos
+    se delegan, así solo se importan los módulos de los hosts que se usan.
+    """
+    __slots__ = ("resolver_name",)
+    
+    def __init__(self, resolver_name: str):
+        if resolver_name not in RESOLVER_MODULE_MAP:
+            raise ValueError(
+                f"Resolver desconocido: {resolver_name}. "
+                f"Resolvers disponibles: {list(RESOLVER_MODULE_MAP.keys())}"
+            )
+        self.resolver_name = resolver_name
+    
+    def resolve(self) -> Type:
+        return _get_resolver_class(self.resolver_name)
+    
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+    
+    def __eq__(self, other):
+        if isinstance(other, _LazyResolver):
+            return self.resolver_name == other.resolver_name
+        return self.resolve() is other
+    
+    def __hash__(self):
+        return hash(self.resolver_name)
+    
+    def __repr__(self):
+        return f"<lazy resolver {self.resolver_name}>"
+
+
 def _get_resolver_class(resolver_name: str) -> Type:
     """
     Obtiene la clase del resolver de forma dinámica.
@@ -56,9 +105,10 @@ def _get_resolver_class(resolver_name: str) -> Type:
     
     module_name = RESOLVER_MODULE_MAP[resolver_name]
     
-    # Importar el módulo dinámicamente
+    # Importar el módulo dinámicamente (sys.modules evita el import si ya está cargado)
+    full_name = f"fetchr.hosts.{module_name}"
     try:
-        module = importlib.import_module(f"fetchr.hosts.{module_name}")
+        module = sys.modules.get(full_name) or importlib.import_module(full_name)
         resolver_class = getattr(module, resolver_name)
         
         # Guardar en cache
@@ -74,6 +124,48 @@ def _get_resolver_class(resolver_name: str) -> Type:
         )
 
 
+# Cabecera del cache: st_mtime_ns y st_size del YAML original
+_CACHE_HEADER = struct.Struct('<qq')
+
+
+def _load_yaml_cached(config_path: Path) -> Dict[str, Any]:
+    """
+    Carga el YAML usando un pickle en CACHE_DIR como cache.
+    
+    El cache guarda el YAML ya parseado (no la configuración procesada, que
+    depende de variables de entorno) y se invalida si cambia mtime o tamaño.
+    """
+    st = config_path.stat()
+    header = _CACHE_HEADER.pack(st.st_mtime_ns, st.st_size)
+    path_hash = hashlib.sha1(str(config_path.resolve()).encode()).hexdigest()[:12]
+    cache_path = CACHE_DIR / f"{config_path.name}.{path_hash}.pkl"
+    
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.read(_CACHE_HEADER.size) == header:
+                return pickle.load(f)
+    except Exception:
+        # Cache inexistente o corrupto: se regenera
+        pass
+    
+    # Se pasa el archivo (no su contenido) para que el loader lo lea por bloques
+    with open(config_path, 'rb') as f:
+        config = yaml.load(f, Loader=_YamlLoader)
+    
+    # Escritura atómica; si el directorio no es escribible simplemente no hay cache
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    
+    return config
+
+
 def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
     """
     Carga la configuración de hosts desde un archivo YAML.
@@ -96,8 +188,7 @@ def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
     if not config_path.exists():
         raise FileNotFoundError(f"Archivo de configuración no encontrado: {config_path}")
     
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    config = _load_yaml_cached(config_path)
     
     # Obtener la lista de hosts de UploadFlix
     upload_flix_hosts = config.get("upload_flix_hosts", [])
@@ -146,7 +237,7 @@ def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
             
             processed_config = {
                 "download_with_aria2c": host_config.get("download_with_aria2c", False),
-                "resolver": _get_resolver_class(resolver_name),
+                "resolver": _LazyResolver(resolver_name),
                 "max_connections": host_config.get("max_connections_premium" if use_premium else "max_connections_free"),
                 "max_concurrent": host_config.get("max_concurrent_premium" if use_premium else "max_concurrent_free"),
                 "use_random_proxy": host_config.get("use_random_proxy_premium" if use_premium else "use_random_proxy_free"),
@@ -157,7 +248,7 @@ def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
             
             processed_config = {
                 "download_with_aria2c": host_config.get("download_with_aria2c", False),
-                "resolver": _get_resolver_class(resolver_name),
+                "resolver": _LazyResolver(resolver_name),
                 "max_connections": host_config.get("max_connections_realdebrid" if use_realdebrid else "max_connections_free"),
                 "max_concurrent": host_config.get("max_concurrent_realdebrid" if use_realdebrid else "max_concurrent_free"),
             }
@@ -166,8 +257,8 @@ def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
             processed_config = {}
             for key, value in host_config.items():
                 if key == "resolver":
-                    # Cargar la clase del resolver dinámicamente
-                    processed_config[key] = _get_resolver_class(value)
+                    # La clase del resolver se importa en el primer uso
+                    processed_config[key] = _LazyResolver(value)
                 else:
                     processed_config[key] = value
         
@@ -178,7 +269,7 @@ def load_hosts_config(config_path: Path = None) -> Dict[str, Any]:
         processed_config = {}
         for key, value in upload_flix_template.items():
             if key == "resolver":
-                processed_config[key] = _get_resolver_class(value)
+                processed_config[key] = _LazyResolver(value)
             else:
                 processed_config[key] = value
         hosts_config[host] = processed_config
@@ -0,0 +1,28 @@
+"""Query counting for tests (catches N+1 regressions)."""
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[List[str]]:
+    """
+    Collect the SQL statements executed on engine inside the block.
+
+    Defaults to the application engine from fetchr.database.session.
+    """
+    if engine is None:
+        from fetchr.database.session import engine
+
+    statements: List[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
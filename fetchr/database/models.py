@@ -1,13 +1,16 @@
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Boolean, BigInteger
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Boolean, BigInteger, Index, case, func
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, selectinload
 
 class Base(DeclarativeBase):
     pass
 
 class Package(Base):
     __tablename__ = "packages"
+    # Fetch server-generated columns (created_at) in the INSERT itself
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -15,27 +18,32 @@ class Package(Base):
     path: Mapped[str] = mapped_column(String, nullable=False)
     
     # Status: QUEUED, ACTIVE, PAUSED, COMPLETED, ERROR
-    status: Mapped[str] = mapped_column(String, default="QUEUED")
+    status: Mapped[str] = mapped_column(String, default="QUEUED", index=True)
     
     # Recursive relationship for subpackages
-    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("packages.id"), nullable=True)
+    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("packages.id"), nullable=True, index=True)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Filled in by SQLite (CURRENT_TIMESTAMP, UTC). default= renders the same
+    # expression inline for databases created before the server default existed
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), server_default=func.now())
     
     # Relationships
     children: Mapped[List["Package"]] = relationship("Package", back_populates="parent", cascade="all, delete-orphan")
     parent: Mapped[Optional["Package"]] = relationship("Package", back_populates="children", remote_side=[id])
     
-    files: Mapped[List["File"]] = relationship("File", back_populates="package", cascade="all, delete-orphan")
+    # selectin: loading N packages costs one extra "WHERE package_id IN (...)"
+    files: Mapped[List["File"]] = relationship("File", back_populates="package", lazy="selectin", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Package(id={self.id}, name='{self.name}', status='{self.status}')>"
 
 class File(Base):
     __tablename__ = "files"
+    # "files of this package in status X"
+    __table_args__ = (Index("ix_file_pkg_status", "package_id", "status"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    package_id: Mapped[int] = mapped_column(ForeignKey("packages.id"))
+    package_id: Mapped[int] = mapped_column(ForeignKey("packages.id"), index=True)
     
     url: Mapped[str] = mapped_column(String, nullable=False)
     filename: Mapped[str] = mapped_column(String, nullable=False)
@@ -43,7 +51,7 @@ class File(Base):
     # Link to Aria2
     aria2_gid: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
     
-    status: Mapped[str] = mapped_column(String, default="QUEUED")
+    status: Mapped[str] = mapped_column(String, default="QUEUED", index=True)
     
     size_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
     downloaded_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -53,13 +61,29 @@ class File(Base):
     error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     # Relationship
-    package: Mapped["Package"] = relationship("Package", back_populates="files")
+    package: Mapped["Package"] = relationship("Package", back_populates="files", lazy="joined")
 
-    @property
+    @hybrid_property
     def progress(self) -> float:
         if self.size_bytes == 0:
             return 0.0
         return (self.downloaded_bytes / self.size_bytes) * 100
 
+    @progress.inplace.expression
+    @classmethod
+    def _progress_expression(cls):
+        # Same formula in SQL, so queries can filter/sort by progress
+        return case(
+            (cls.size_bytes == 0, 0.0),
+            else_=cls.downloaded_bytes * 100.0 / cls.size_bytes,
+        )
+
     def __repr__(self):
         return f"<File(id={self.id}, filename='{self.filename}', status='{self.status}')>"
+
+def with_tree(depth: int = -1):
+    """Loader option that eagerly loads Package.children (all levels by default).
+
+    Usage: select(Package).options(with_tree())
+    """
+    return selectinload(Package.children, recursion_depth=depth)
@@ -1,18 +1,43 @@
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session, raiseload
 from fetchr.database.models import Base
 
 # Default to a local SQLite database in the user's home directory or project directory
 DB_PATH = Path("fetchr.db")
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# Applied to every new SQLite connection: WAL lets readers run alongside the
+# writer and synchronous=NORMAL skips the fsync on each commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False}, # Needed for SQLite with multithreading
+    connect_args={"check_same_thread": False, "timeout": 30}, # Needed for SQLite with multithreading
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=False,
     echo=False
 )
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
 
 # Scoped session for thread safety if needed
@@ -21,6 +46,11 @@ db_session = scoped_session(SessionLocal)
 def init_db():
     """Create tables if they don't exist"""
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so indexes added to the
+    # models later are created here (CREATE INDEX IF NOT EXISTS)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     """Dependency for getting a DB session"""
@@ -29,3 +59,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def strict_loading_enabled() -> bool:
+    """True when FETCHR_STRICT_DB=1 (enabled by the test suite)"""
+    return os.getenv("FETCHR_STRICT_DB") == "1"
+
+@contextmanager
+def strict_loading(*options):
+    """
+    Session whose SELECTs get the given loader options (selectinload(...), ...).
+
+    With FETCHR_STRICT_DB=1 raiseload('*') is added too, so touching any
+    relationship not loaded by `options` raises instead of issuing a lazy
+    query per row.
+    """
+    if strict_loading_enabled():
+        options = (raiseload("*"),) + options
+
+    session = SessionLocal()
+
+    @event.listens_for(session, "do_orm_execute")
+    def _apply_options(state):
+        if state.is_select and not state.is_column_load and not state.is_relationship_load:
+            state.statement = state.statement.options(*options)
+
+    try:
+        yield session
+    finally:
+        session.close()
@@ -1,8 +1,10 @@
+import aiohttp
+import orjson
 from fetchr.config import REALDEBRID_BEARER_TOKEN
+from fetchr.network import get_shared_session
 
 
 async def get_direct_link(link: str):
-    import aiohttp
     url = "https://app.real-debrid.com/rest/1.0/unrestrict/link"
     headers = {
         "Authorization": f"Bearer {REALDEBRID_BEARER_TOKEN}",
@@ -15,9 +17,7 @@ async def get_direct_link(link: str):
         "password": ""
     }
     
-    session = aiohttp.ClientSession()
-    resp = await session.post(url, headers=headers, data=data, timeout=15)
-    resp.raise_for_status()
-    response = await resp.json()
-    await session.close()
+    async with get_shared_session().post(url, headers=headers, data=data, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+        resp.raise_for_status()
+        response = orjson.loads(await resp.read())
     return response["download"]
@@ -5,15 +5,38 @@ Validates that host resolvers can complete their minimum flow sequence
 without performing actual downloads.
 """
 import asyncio
+import atexit
+import threading
 import aiohttp
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+from functools import partial
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Callable, Awaitable, List
+from typing import AsyncIterator, ClassVar, Dict, Literal, Optional, Callable, Awaitable, List, Tuple
 from abc import ABC, abstractmethod
 import logging
+import re
 import time
 
 logger = logging.getLogger("fetchr.health")
 
+# Wall-clock cap for a single host's check, so one wedged host can't hold up the rest
+PER_CHECK_TIMEOUT = 5.0
+# Checks in flight at once per HealthChecker
+MAX_CONCURRENT_CHECKS = 8
+# Seconds a host's result is reused before it is checked again (0 disables)
+HEALTH_CACHE_TTL = 60.0
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Marker words expected on the 1fichier home page (searched in the raw bytes)
+_ONEFICHIER_MARKER = re.compile(rb"upload|fichier", re.IGNORECASE)
+
+# "liveness" only probes that the host answers; "deep" runs the full flow
+CheckDepth = Literal["liveness", "deep"]
+
 
 @dataclass
 class HealthCheckResult:
@@ -45,28 +68,44 @@ class BaseHealthCheck(ABC):
     3. Submit form or POST action
     4. Validate response structure
     5. Return success/failure
+    
+    Steps listed in deep_steps only run with depth="deep"; in liveness
+    mode they are marked completed without touching the network.
     """
     
     host_name: str = "unknown"
     test_url: Optional[str] = None
     timeout: int = 30
-    
-    def __init__(self):
+    # (name, description, failure message); step "x" runs self._step_x()
+    STEPS: ClassVar[List[Tuple[str, str, str]]] = [
+        ("initial_request", "Execute initial GET request", "Initial request failed"),
+        ("extract_selector", "Extract required selector", "Could not extract required selector"),
+        ("submit_action", "Submit form or action", "Form/action submission failed"),
+        ("validate_response", "Validate response structure", "Response validation failed"),
+    ]
+    deep_steps: Tuple[str, ...] = ()
+    
+    def __init__(self, depth: CheckDepth = "liveness"):
+        self.depth = depth
         self.steps: List[FlowStep] = []
+        # Set by HealthChecker to its shared session, otherwise created on __aenter__
         self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-        )
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=DEFAULT_HEADERS
+            )
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self._owns_session:
             await self.session.close()
+            self.session = None
+            self._owns_session = False
     
     def _add_step(self, name: str, description: str) -> FlowStep:
         step = FlowStep(name=name, description=description)
@@ -80,23 +119,41 @@ class BaseHealthCheck(ABC):
         step.error = error
         step.completed = False
     
+    async def _probe_status(self, url: str, **kwargs) -> int:
+        """
+        Status code of url without downloading the body: HEAD, or a GET
+        that is released unread if the server refuses HEAD.
+        """
+        async with self.session.head(url, allow_redirects=True, **kwargs) as response:
+            if response.status not in (405, 501):
+                return response.status
+        async with self.session.get(url, **kwargs) as response:
+            status = response.status
+            response.release()
+            return status
+    
+    async def _run_step(self, step: FlowStep) -> bool:
+        if self.depth != "deep" and step.name in self.deep_steps:
+            return True
+        return await getattr(self, f"_step_{step.name}")()
+    
     @abstractmethod
-    async def _step1_initial_request(self) -> bool:
+    async def _step_initial_request(self) -> bool:
         """Step 1: Execute initial GET request."""
         pass
     
     @abstractmethod
-    async def _step2_extract_selector(self) -> bool:
+    async def _step_extract_selector(self) -> bool:
         """Step 2: Extract required selector/element from response."""
         pass
     
     @abstractmethod
-    async def _step3_submit_action(self) -> bool:
+    async def _step_submit_action(self) -> bool:
         """Step 3: Submit form or POST action."""
         pass
     
     @abstractmethod
-    async def _step4_validate_response(self) -> bool:
+    async def _step_validate_response(self) -> bool:
         """Step 4: Validate response structure matches expected format."""
         pass
     
@@ -109,82 +166,28 @@ class BaseHealthCheck(ABC):
         start_time = time.monotonic()
         steps_completed = []
         
-        try:
-            # Step 1: Initial request
-            step1 = self._add_step("initial_request", "Execute initial GET request")
-            if await self._step1_initial_request():
-                self._complete_step(step1)
-                steps_completed.append(step1.name)
-            else:
-                return HealthCheckResult(
-                    success=False,
-                    message="Failed at step 1: Initial request failed",
-                    host=self.host_name,
-                    elapsed_ms=(time.monotonic() - start_time) * 1000,
-                    steps_completed=steps_completed
-                )
-            
-            # Step 2: Extract selector
-            step2 = self._add_step("extract_selector", "Extract required selector")
-            if await self._step2_extract_selector():
-                self._complete_step(step2)
-                steps_completed.append(step2.name)
-            else:
-                return HealthCheckResult(
-                    success=False,
-                    message="Failed at step 2: Could not extract required selector",
-                    host=self.host_name,
-                    elapsed_ms=(time.monotonic() - start_time) * 1000,
-                    steps_completed=steps_completed
-                )
-            
-            # Step 3: Submit action
-            step3 = self._add_step("submit_action", "Submit form or action")
-            if await self._step3_submit_action():
-                self._complete_step(step3)
-                steps_completed.append(step3.name)
-            else:
-                return HealthCheckResult(
-                    success=False,
-                    message="Failed at step 3: Form/action submission failed",
-                    host=self.host_name,
-                    elapsed_ms=(time.monotonic() - start_time) * 1000,
-                    steps_completed=steps_completed
-                )
-            
-            # Step 4: Validate response
-            step4 = self._add_step("validate_response", "Validate response structure")
-            if await self._step4_validate_response():
-                self._complete_step(step4)
-                steps_completed.append(step4.name)
-            else:
-                return HealthCheckResult(
-                    success=False,
-                    message="Failed at step 4: Response validation failed",
-                    host=self.host_name,
-                    elapsed_ms=(time.monotonic() - start_time) * 1000,
-                    steps_completed=steps_completed
-                )
-            
-            elapsed = (time.monotonic() - start_time) * 1000
+        def result(success: bool, message: str, error: Optional[Exception] = None) -> HealthCheckResult:
             return HealthCheckResult(
-                success=True,
-                message=f"All {len(steps_completed)} steps completed successfully",
+                success=success,
+                message=message,
                 host=self.host_name,
-                elapsed_ms=elapsed,
-                steps_completed=steps_completed
+                elapsed_ms=(time.monotonic() - start_time) * 1000,
+                steps_completed=steps_completed,
+                error=error
             )
+        
+        try:
+            for number, (name, description, failure) in enumerate(self.STEPS, 1):
+                step = self._add_step(name, description)
+                if not await self._run_step(step):
+                    return result(False, f"Failed at step {number}: {failure}")
+                self._complete_step(step)
+                steps_completed.append(name)
+            
+            return result(True, f"All {len(steps_completed)} steps completed successfully")
             
         except Exception as e:
-            elapsed = (time.monotonic() - start_time) * 1000
-            return HealthCheckResult(
-                success=False,
-                message=f"Health check failed with error: {str(e)}",
-                host=self.host_name,
-                elapsed_ms=elapsed,
-                steps_completed=steps_completed,
-                error=e
-            )
+            return result(False, f"Health check failed with error: {str(e)}", e)
 
 
 class GofileHealthCheck(BaseHealthCheck):
@@ -192,13 +195,15 @@ class GofileHealthCheck(BaseHealthCheck):
     
     host_name = "gofile.io"
     base_url = "https://api.gofile.io"
+    # Account creation/lookup; /servers alone says the API is up
+    deep_steps = ("extract_selector", "submit_action", "validate_response")
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, depth: CheckDepth = "liveness"):
+        super().__init__(depth)
         self.token: Optional[str] = None
         self.account_data: Optional[dict] = None
     
-    async def _step1_initial_request(self) -> bool:
+    async def _step_initial_request(self) -> bool:
         """Check API is accessible."""
         async with self.session.get(f"{self.base_url}/servers") as response:
             if response.status == 200:
@@ -206,7 +211,7 @@ class GofileHealthCheck(BaseHealthCheck):
                 return data.get("status") == "ok"
         return False
     
-    async def _step2_extract_selector(self) -> bool:
+    async def _step_extract_selector(self) -> bool:
         """Get account token from API."""
         async with self.session.post(f"{self.base_url}/accounts") as response:
             if response.status == 200:
@@ -216,7 +221,7 @@ class GofileHealthCheck(BaseHealthCheck):
                     return self.token is not None
         return False
     
-    async def _step3_submit_action(self) -> bool:
+    async def _step_submit_action(self) -> bool:
         """Validate token works by checking account."""
         if not self.token:
             return False
@@ -229,7 +234,7 @@ class GofileHealthCheck(BaseHealthCheck):
                 return data.get("status") == "ok"
         return False
     
-    async def _step4_validate_response(self) -> bool:
+    async def _step_validate_response(self) -> bool:
         """Validate account data structure."""
         if not self.account_data:
             return False
@@ -243,30 +248,32 @@ class PixeldrainHealthCheck(BaseHealthCheck):
     host_name = "pixeldrain.com"
     base_url = "https://pixeldrain.com"
     api_url = "https://pixeldrain.com/api"
+    deep_steps = ("extract_selector", "submit_action", "validate_response")
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, depth: CheckDepth = "liveness"):
+        super().__init__(depth)
         self.api_accessible = False
     
-    async def _step1_initial_request(self) -> bool:
-        """Check main site is accessible."""
-        async with self.session.get(self.base_url) as response:
-            return response.status == 200
+    async def _step_initial_request(self) -> bool:
+        """Check main site is accessible (just the API ping in liveness mode)."""
+        if self.depth != "deep":
+            return await self._step_extract_selector()
+        return await self._probe_status(self.base_url) == 200
     
-    async def _step2_extract_selector(self) -> bool:
+    async def _step_extract_selector(self) -> bool:
         """Check API endpoint structure."""
-        async with self.session.get(f"{self.api_url}/misc/ping") as response:
-            return response.status in [200, 404]  # 404 means API is there but endpoint doesn't exist
+        status = await self._probe_status(f"{self.api_url}/misc/ping")
+        return status in [200, 404]  # 404 means API is there but endpoint doesn't exist
     
-    async def _step3_submit_action(self) -> bool:
+    async def _step_submit_action(self) -> bool:
         """Test API with a known action."""
         # Test the user endpoint (will fail auth but confirms API works)
-        async with self.session.get(f"{self.api_url}/user") as response:
-            # 401 means API is working but needs auth
-            self.api_accessible = response.status in [200, 401, 403]
-            return self.api_accessible
+        status = await self._probe_status(f"{self.api_url}/user")
+        # 401 means API is working but needs auth
+        self.api_accessible = status in [200, 401, 403]
+        return self.api_accessible
     
-    async def _step4_validate_response(self) -> bool:
+    async def _step_validate_response(self) -> bool:
         """Validate API is responding correctly."""
         return self.api_accessible
 
@@ -276,31 +283,40 @@ class OneFichierHealthCheck(BaseHealthCheck):
     
     host_name = "1fichier.com"
     base_url = "https://1fichier.com"
+    # /console/ probe; the home page already proves the site is up
+    deep_steps = ("submit_action",)
+    
+    # Only the start of the home page is inspected
+    PAGE_SAMPLE_BYTES = 4096
     
-    def __init__(self):
-        super().__init__()
-        self.page_content: Optional[str] = None
+    def __init__(self, depth: CheckDepth = "liveness"):
+        super().__init__(depth)
+        self.page_content: Optional[bytes] = None
     
-    async def _step1_initial_request(self) -> bool:
+    async def _step_initial_request(self) -> bool:
         """Check main site is accessible."""
         async with self.session.get(self.base_url) as response:
             if response.status == 200:
-                self.page_content = await response.text()
+                try:
+                    self.page_content = await response.content.readexactly(self.PAGE_SAMPLE_BYTES)
+                except asyncio.IncompleteReadError as e:
+                    # Page shorter than the sample
+                    self.page_content = e.partial
                 return True
         return False
     
-    async def _step2_extract_selector(self) -> bool:
+    async def _step_extract_selector(self) -> bool:
         """Check for upload form presence."""
         if not self.page_content:
             return False
-        return "upload" in self.page_content.lower() or "fichier" in self.page_content.lower()
+        return _ONEFICHIER_MARKER.search(self.page_content) is not None
     
-    async def _step3_submit_action(self) -> bool:
+    async def _step_submit_action(self) -> bool:
         """Verify console/API endpoint exists."""
-        async with self.session.get(f"{self.base_url}/console/") as response:
-            return response.status in [200, 302, 401, 403]
+        status = await self._probe_status(f"{self.base_url}/console/")
+        return status in [200, 302, 401, 403]
     
-    async def _step4_validate_response(self) -> bool:
+    async def _step_validate_response(self) -> bool:
         """Validate site structure."""
         return self.page_content is not None and len(self.page_content) > 100
 
@@ -308,18 +324,18 @@ class OneFichierHealthCheck(BaseHealthCheck):
 class GenericAPIHealthCheck(BaseHealthCheck):
     """Generic health check for API-based hosts."""
     
-    def __init__(self, host_name: str, base_url: str, api_endpoint: str = "/"):
-        super().__init__()
+    def __init__(self, host_name: str, base_url: str, api_endpoint: str = "/",
+                 depth: CheckDepth = "liveness"):
+        super().__init__(depth)
         self.host_name = host_name
         self.base_url = base_url
         self.api_endpoint = api_endpoint
         self.response_data = None
     
-    async def _step1_initial_request(self) -> bool:
-        async with self.session.get(self.base_url) as response:
-            return response.status in [200, 301, 302]
+    async def _step_initial_request(self) -> bool:
+        return await self._probe_status(self.base_url) in [200, 301, 302]
     
-    async def _step2_extract_selector(self) -> bool:
+    async def _step_extract_selector(self) -> bool:
         async with self.session.get(f"{self.base_url}{self.api_endpoint}") as response:
             if response.status == 200:
                 try:
@@ -330,39 +346,169 @@ class GenericAPIHealthCheck(BaseHealthCheck):
                     return len(self.response_data) > 0
             return response.status in [401, 403]  # Auth required = API exists
     
-    async def _step3_submit_action(self) -> bool:
+    async def _step_submit_action(self) -> bool:
         return self.response_data is not None or True
     
-    async def _step4_validate_response(self) -> bool:
+    async def _step_validate_response(self) -> bool:
         return True
 
 
+class _LazyChecks(Mapping):
+    """host -> check instance, built from its factory the first time it is used."""
+    
+    def __init__(self, factories: Dict[str, Callable[..., BaseHealthCheck]], depth: CheckDepth):
+        self._factories = factories
+        self._depth = depth
+        self._instances: Dict[str, BaseHealthCheck] = {}
+    
+    def __getitem__(self, host: str) -> BaseHealthCheck:
+        check = self._instances.get(host)
+        if check is None:
+            check = self._instances[host] = self._factories[host](depth=self._depth)
+        return check
+    
+    def __contains__(self, host) -> bool:
+        return host in self._factories
+    
+    def __iter__(self):
+        return iter(self._factories)
+    
+    def __len__(self) -> int:
+        return len(self._factories)
+
+
 class HealthChecker:
     """
     Main health checker that runs checks against all supported hosts.
     """
     
-    def __init__(self):
-        self.checks: Dict[str, BaseHealthCheck] = {
-            "gofile": GofileHealthCheck(),
-            "pixeldrain": PixeldrainHealthCheck(),
-            "1fichier": OneFichierHealthCheck(),
-        }
+    # host name -> check factory, called with depth= when the host is first checked
+    _CHECK_FACTORIES: ClassVar[Dict[str, Callable[..., BaseHealthCheck]]] = {
+        "gofile": GofileHealthCheck,
+        "pixeldrain": PixeldrainHealthCheck,
+        "1fichier": OneFichierHealthCheck,
+        # Generic checks for other hosts
+        **{
+            name: partial(GenericAPIHealthCheck, name, url)
+            for name, url in [
+                ("krakenfiles", "https://krakenfiles.com"),
+                ("uploadflix", "https://uploadflix.cc"),
+                ("ranoz", "https://ranoz.gg"),
+                ("filedot", "https://filedot.to"),
+                ("desiupload", "https://desiupload.co"),
+                ("filemirage", "https://filemirage.com"),
+                ("uploadee", "https://upload.ee"),
+                ("uploadhive", "https://uploadhive.com"),
+            ]
+        },
+    }
+    
+    def __init__(self, per_check_timeout: float = PER_CHECK_TIMEOUT,
+                 max_concurrent: int = MAX_CONCURRENT_CHECKS,
+                 cache_ttl: float = HEALTH_CACHE_TTL,
+                 depth: CheckDepth = "liveness"):
+        self.per_check_timeout = per_check_timeout
+        self.depth = depth
+        self.cache_ttl = cache_ttl
+        self._sem = asyncio.Semaphore(max_concurrent)
+        # host -> (completed_at, result), and the check currently running per host
+        self._cache: Dict[str, Tuple[float, HealthCheckResult]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.checks: Mapping[str, BaseHealthCheck] = _LazyChecks(self._CHECK_FACTORIES, depth)
+        
+        # Session shared by every check; kept open between calls only while
+        # the checker is used as an async context manager
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self):
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the shared session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=BaseHealthCheck.timeout),
+            headers=DEFAULT_HEADERS
+        )
+    
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """The open shared session, or a session for the duration of one call."""
+        if self._session is not None and not self._session.closed:
+            yield self._session
+            return
+        session = self._new_session()
+        try:
+            yield session
+        finally:
+            await session.close()
+    
+    async def _run_check(self, check: BaseHealthCheck, session: aiohttp.ClientSession) -> HealthCheckResult:
+        # The timeout only starts once a slot is free
+        async with self._sem:
+            check.session = session
+            try:
+                return await asyncio.wait_for(check.check(), timeout=self.per_check_timeout)
+            except asyncio.TimeoutError:
+                return HealthCheckResult(
+                    success=False,
+                    message=f"Health check timed out after {self.per_check_timeout:.1f}s",
+                    host=check.host_name,
+                    elapsed_ms=self.per_check_timeout * 1000
+                )
+            finally:
+                check.session = None
+    
+    async def _cached_check(self, name: str, session: aiohttp.ClientSession) -> HealthCheckResult:
+        """Run a host's check, reusing a fresh cached result or one already in flight."""
+        cached = self._cache.get(name)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
         
-        # Add generic checks for other hosts
-        generic_hosts = [
-            ("krakenfiles", "https://krakenfiles.com"),
-            ("uploadflix", "https://uploadflix.cc"),
-            ("ranoz", "https://ranoz.gg"),
-            ("filedot", "https://filedot.to"),
-            ("desiupload", "https://desiupload.co"),
-            ("filemirage", "https://filemirage.com"),
-            ("uploadee", "https://upload.ee"),
-            ("uploadhive", "https://uploadhive.com"),
-        ]
+        inflight = self._inflight.get(name)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only re-raise if we were cancelled, not the caller running the check
+                if not inflight.cancelled():
+                    raise
+                return await self._cached_check(name, session)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            result = await self._run_check(self.checks[name], session)
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # Waiters get it re-raised; don't warn about it
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._inflight[name]
         
-        for name, url in generic_hosts:
-            self.checks[name] = GenericAPIHealthCheck(name, url)
+        # Timestamp taken after the check finished, so the TTL counts from completion
+        self._cache[name] = (time.monotonic(), result)
+        future.set_result(result)
+        return result
     
     async def check_host(self, host: str) -> HealthCheckResult:
         """
@@ -375,15 +521,55 @@ class HealthChecker:
             HealthCheckResult with status and details
         """
         if host not in self.checks:
-            return HealthCheckResult(
-                success=False,
-                message=f"Unknown host: {host}",
-                host=host
-            )
+            return self._unknown_host(host)
+        
+        async with self._session_scope() as session:
+            return await self._cached_check(host, session)
+    
+    async def _check_host(self, host: str, session: aiohttp.ClientSession) -> HealthCheckResult:
+        if host not in self.checks:
+            return self._unknown_host(host)
+        return await self._cached_check(host, session)
+    
+    @staticmethod
+    def _unknown_host(host: str) -> HealthCheckResult:
+        return HealthCheckResult(
+            success=False,
+            message=f"Unknown host: {host}",
+            host=host
+        )
+    
+    async def iter_check_all(self, parallel: bool = True) -> AsyncIterator[Tuple[str, HealthCheckResult]]:
+        """
+        Run health checks for all registered hosts, yielding (name, result)
+        pairs as each check finishes.
         
-        check = self.checks[host]
-        async with check:
-            return await check.check()
+        Args:
+            parallel: Run checks in parallel (default True)
+        """
+        async with self._session_scope() as session:
+            if not parallel:
+                for name in self.checks:
+                    yield name, await self._cached_check(name, session)
+                return
+            
+            async def run_check(name: str):
+                return name, await self._cached_check(name, session)
+            
+            tasks = [asyncio.ensure_future(run_check(name)) for name in self.checks]
+            try:
+                # Completion order, so fast hosts aren't queued behind slow ones
+                for next_result in asyncio.as_completed(tasks):
+                    try:
+                        name, check_result = await next_result
+                    except Exception as e:
+                        logger.error(f"Health check error: {e}")
+                    else:
+                        yield name, check_result
+            finally:
+                # Consumer stopped early: don't leave checks running on a closed session
+                for task in tasks:
+                    task.cancel()
     
     async def check_all(self, parallel: bool = True) -> Dict[str, HealthCheckResult]:
         """
@@ -395,28 +581,7 @@ class HealthChecker:
         Returns:
             Dictionary mapping host names to their HealthCheckResult
         """
-        results = {}
-        
-        if parallel:
-            async def run_check(name: str, check: BaseHealthCheck):
-                async with check:
-                    return name, await check.check()
-            
-            tasks = [run_check(name, check) for name, check in self.checks.items()]
-            completed = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in completed:
-                if isinstance(result, Exception):
-                    logger.error(f"Health check error: {result}")
-                else:
-                    name, check_result = result
-                    results[name] = check_result
-        else:
-            for name, check in self.checks.items():
-                async with check:
-                    results[name] = await check.check()
-        
-        return results
+        return {name: result async for name, result in self.iter_check_all(parallel)}
     
     async def check_hosts(self, hosts: List[str]) -> Dict[str, HealthCheckResult]:
         """
@@ -430,11 +595,12 @@ class HealthChecker:
         """
         results = {}
         
-        async def run_check(name: str):
-            return name, await self.check_host(name)
-        
-        tasks = [run_check(name) for name in hosts]
-        completed = await asyncio.gather(*tasks, return_exceptions=True)
+        async with self._session_scope() as session:
+            async def run_check(name: str):
+                return name, await self._check_host(name, session)
+            
+            tasks = [run_check(name) for name in hosts]
+            completed = await asyncio.gather(*tasks, return_exceptions=True)
         
         for result in completed:
             if isinstance(result, Exception):
@@ -446,6 +612,46 @@ class HealthChecker:
         return results
 
 
+# health() runs every call on one background event loop with one long-lived
+# HealthChecker, so the session pool and result cache survive between calls
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+_CHECKER: Optional[HealthChecker] = None
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="fetchr-health", daemon=True).start()
+            _LOOP = loop
+            atexit.register(_close_background_loop)
+        return _LOOP
+
+
+async def _get_checker() -> HealthChecker:
+    global _CHECKER
+    if _CHECKER is None:
+        _CHECKER = HealthChecker()
+        await _CHECKER.__aenter__()
+    return _CHECKER
+
+
+def _close_background_loop():
+    global _LOOP, _CHECKER
+    loop, _LOOP = _LOOP, None
+    if loop is None:
+        return
+    if _CHECKER is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_CHECKER.aclose(), loop).result(timeout=5)
+        except Exception:
+            pass
+        _CHECKER = None
+    loop.call_soon_threadsafe(loop.stop)
+
+
 def health(host: Optional[str] = None) -> bool:
     """
     Synchronous wrapper for health checks.
@@ -457,7 +663,7 @@ def health(host: Optional[str] = None) -> bool:
         True if all checked hosts pass, False otherwise.
     """
     async def _run():
-        checker = HealthChecker()
+        checker = await _get_checker()
         if host:
             result = await checker.check_host(host)
             return result.success
@@ -465,7 +671,7 @@ def health(host: Optional[str] = None) -> bool:
             results = await checker.check_all()
             return all(r.success for r in results.values())
     
-    return asyncio.run(_run())
+    return asyncio.run_coroutine_threadsafe(_run(), _get_background_loop()).result()
 
 
 async def async_health(host: Optional[str] = None) -> bool:
@@ -478,28 +684,29 @@ async def async_health(host: Optional[str] = None) -> bool:
     Returns:
         True if all checked hosts pass, False otherwise.
     """
-    checker = HealthChecker()
-    if host:
-        result = await checker.check_host(host)
-        return result.success
-    else:
-        results = await checker.check_all()
-        return all(r.success for r in results.values())
+    async with HealthChecker() as checker:
+        if host:
+            result = await checker.check_host(host)
+            return result.success
+        else:
+            results = await checker.check_all()
+            return all(r.success for r in results.values())
 
 
 if __name__ == "__main__":
     async def main():
-        checker = HealthChecker()
-        
         print("Running health checks for all hosts...\n")
-        results = await checker.check_all()
-        
-        for host, result in results.items():
-            status = "OK" if result.success else "FAILED"
-            print(f"[{status}] {host}: {result.message} ({result.elapsed_ms:.0f}ms)")
-            if result.steps_completed:
-                print(f"       Steps: {' -> '.join(result.steps_completed)}")
+        healthy = total = 0
+        async with HealthChecker() as checker:
+            # Print each host as soon as its check finishes
+            async for host, result in checker.iter_check_all():
+                total += 1
+                healthy += result.success
+                status = "OK" if result.success else "FAILED"
+                print(f"[{status}] {host}: {result.message} ({result.elapsed_ms:.0f}ms)")
+                if result.steps_completed:
+                    print(f"       Steps: {' -> '.join(result.steps_completed)}")
         
-        print(f"\nTotal: {sum(1 for r in results.values() if r.success)}/{len(results)} hosts healthy")
+        print(f"\nTotal: {healthy}/{total} hosts healthy")
     
     asyncio.run(main())
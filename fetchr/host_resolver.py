@@ -1,14 +1,43 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import List, Tuple, Type
 from fetchr.types import DownloadInfo
 
 class AbstractHostResolver(ABC):
+    # Extra hostnames served by this resolver, besides its 'host' attribute
+    hosts: Tuple[str, ...] = ()
 
     @abstractmethod
     async def get_download_info(self, url: str) -> DownloadInfo:
         pass
 
+    async def get_download_info_batch(self, urls: List[str]) -> List[DownloadInfo]:
+        """
+        Resolve several URLs at once. By default they are resolved
+        concurrently; resolvers with a batch API override this.
+        Folder results (lists) are flattened into the returned list.
+        """
+        results = await asyncio.gather(*(self.get_download_info(url) for url in urls))
+        infos: List[DownloadInfo] = []
+        for result in results:
+            if isinstance(result, list):
+                infos.extend(result)
+            else:
+                infos.append(result)
+        return infos
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
\ No newline at end of file
+        pass
+
+
+# Concrete resolvers, filled in by @register_resolver as each host module is imported
+RESOLVERS: List[Type[AbstractHostResolver]] = []
+
+
+def register_resolver(cls: Type[AbstractHostResolver]) -> Type[AbstractHostResolver]:
+    """Class decorator that makes a resolver available to fetchr.hosts.get_resolver."""
+    RESOLVERS.append(cls)
+    return cls
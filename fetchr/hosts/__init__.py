@@ -1,44 +1,58 @@
+import functools
 import importlib
-import pkgutil
-from typing import Optional, List, Type
+from typing import Dict, Optional, List, Tuple, Type
+from urllib.parse import urlsplit
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, RESOLVERS, register_resolver
 import logging
 
 logger = logging.getLogger(__name__)
 
-# List to hold registered resolver classes
-RESOLVERS: List[Type[AbstractHostResolver]] = []
+# Host modules that define resolvers. Importing one registers its resolver
+# through @register_resolver; they are only imported on the first get_resolver()
+_RESOLVER_MODULES = (
+    "anonfile",
+    "axfc",
+    "desiupload",
+    "exload",
+    "filedot",
+    "filemirage",
+    "gofile",
+    "krakenfiles",
+    "onefichier",
+    "pixeldrain",
+    "ranoz",
+    "sendnow",
+    "uploadee",
+    "uploadflix",
+    "uploadhive",
+    "usersdrive",
+)
+_discovered = False
+
+# netloc -> resolver class; (host, class) for the substring fallback; and the
+# resolvers that need their own match(url). Rebuilt whenever RESOLVERS grows.
+_HOST_INDEX: Dict[str, Type[AbstractHostResolver]] = {}
+_HOST_TOKENS: List[Tuple[str, Type[AbstractHostResolver]]] = []
+_CUSTOM_MATCHERS: List[Type[AbstractHostResolver]] = []
+_indexed_count = -1
 
 # Default/fallback resolver when no specific host matches (passthrough = direct URL)
 from .passtrought import PassThroughResolver
 
 def _discover_resolvers():
     """
-    Dynamically discover and register resolver classes from the current package.
+    Import every resolver module so their classes get registered.
     """
-    global RESOLVERS
-    if RESOLVERS:
+    global _discovered
+    if _discovered:
         return
+    _discovered = True
 
-    package_name = __name__
-    package_path = __path__
-
-    for _, name, _ in pkgutil.iter_modules(package_path):
+    for name in _RESOLVER_MODULES:
         try:
-            full_module_name = f"{package_name}.{name}"
-            module = importlib.import_module(full_module_name)
-            
-            for attribute_name in dir(module):
-                attribute = getattr(module, attribute_name)
-                
-                if (isinstance(attribute, type) and 
-                    issubclass(attribute, AbstractHostResolver) and 
-                    attribute is not AbstractHostResolver and
-                    attribute.__module__ == full_module_name): # Avoid importing base classes re-exported
-                    
-                    RESOLVERS.append(attribute)
-                    logger.debug(f"Registered resolver: {attribute.__name__}")
+            # Modules already loaded (e.g. by config_loader) are just a sys.modules hit
+            importlib.import_module(f"{__name__}.{name}")
         except Exception as e:
             logger.warning(f"Failed to load module {name}: {e}")
 
@@ -57,14 +71,71 @@ def _resolver_matches(resolver_cls: Type[AbstractHostResolver], url: str) -> boo
         return host in url
     return False
 
+def _build_index():
+    """Index registered resolvers by hostname (first registered wins)."""
+    global _indexed_count
+    _HOST_INDEX.clear()
+    _HOST_TOKENS.clear()
+    _CUSTOM_MATCHERS.clear()
+    for resolver_cls in RESOLVERS:
+        if resolver_cls is PassThroughResolver:
+            continue
+        if callable(getattr(resolver_cls, "match", None)):
+            _CUSTOM_MATCHERS.append(resolver_cls)
+            continue
+        host = getattr(resolver_cls, "host", None)
+        names = tuple(resolver_cls.hosts)
+        if host and isinstance(host, str):
+            names = (host,) + names
+        for name in names:
+            _HOST_INDEX.setdefault(name.lower(), resolver_cls)
+            _HOST_TOKENS.append((name, resolver_cls))
+    _indexed_count = len(RESOLVERS)
+    _resolver_cls_for_host.cache_clear()
+
+def _lookup_host(url: str) -> Optional[Type[AbstractHostResolver]]:
+    """Find a resolver by the URL hostname or any of its parent domains."""
+    try:
+        hostname = urlsplit(url).hostname
+    except ValueError:
+        return None
+    if not hostname:
+        return None
+    return _resolver_cls_for_host(hostname)
+
+# A package usually has many files on the same host; only the class choice is
+# cached, resolvers are still instantiated per call (they hold session state)
+@functools.lru_cache(maxsize=256)
+def _resolver_cls_for_host(hostname: str) -> Optional[Type[AbstractHostResolver]]:
+    # store1.gofile.io -> gofile.io -> io
+    while True:
+        resolver_cls = _HOST_INDEX.get(hostname)
+        if resolver_cls is not None:
+            return resolver_cls
+        dot = hostname.find(".")
+        if dot < 0:
+            return None
+        hostname = hostname[dot + 1:]
+
 def get_resolver(url: str) -> AbstractHostResolver:
     """
     Factory function to get the appropriate resolver for a given URL.
     Uses PassThroughResolver as default when no specific resolver matches.
     """
     _discover_resolvers()
+    if _indexed_count != len(RESOLVERS):
+        _build_index()
 
-    for resolver_cls in RESOLVERS:
+    resolver_cls = _lookup_host(url)
+    if resolver_cls is not None:
+        return resolver_cls()
+
+    # Host names appearing elsewhere in the URL (plain substring test, no Python per resolver)
+    for token, resolver_cls in _HOST_TOKENS:
+        if token in url:
+            return resolver_cls()
+
+    for resolver_cls in _CUSTOM_MATCHERS:
         try:
             if _resolver_matches(resolver_cls, url):
                 return resolver_cls()
@@ -1,21 +1,40 @@
 import aiohttp
 import asyncio
+import functools
 import time
 import re
 import math
-from bs4 import BeautifulSoup
+from html import unescape
+from bs4 import BeautifulSoup, SoupStrainer
+from .common import iter_form_inputs, parse_html, probe_content_length
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, Callable, Awaitable
 from urllib.parse import urljoin, urlparse
 from yarl import URL
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
-from fetchr.network import get_aiohttp_proxy_connector
+from ..host_resolver import AbstractHostResolver, register_resolver
+from fetchr.network import ACCEPT_ENCODING, create_session, get_aiohttp_proxy_connector
 import logging
 import os
 import urllib.parse
 logger = logging.getLogger(__name__)
 
+_RE_SIZE_MB = re.compile(r'size:\s*(\d+\.?\d*)\s*MB', re.IGNORECASE)
+_RE_EXPIRES = re.compile(r'next\s+(\d+)\s+hours?')
+_RE_FILE_ID = re.compile(r'anonfile\.de/([a-zA-Z0-9]+)')
+# <a class="... stretched-link ..." href="..."> of the premium download page
+_RE_STRETCHED = re.compile(rb'<a\b[^>]*\bclass=["\'][^"\']*\bstretched-link\b[^>]*>', re.IGNORECASE)
+_RE_HREF = re.compile(rb'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+# Solo los elementos que se consultan: captcha (td img), título, avisos y enlaces
+_STRAINER = SoupStrainer(['table', 'h1', 'div', 'a'])
+_STRAINER_LINKS = SoupStrainer('a')
+
+@functools.lru_cache(maxsize=32)
+def _origin_and_host(url: str) -> tuple[str, str]:
+    """(Origin, Host) de una URL; la misma URL se repite entre reintentos"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}", parsed.netloc
+
 class TimeoutSkipped(Exception):
     """Timeout skipped"""
     pass
@@ -24,6 +43,7 @@ class WrongCaptcha(Exception):
     pass
 
 
+@register_resolver
 class AnonFileResolver(AbstractHostResolver):
     host = "anonfile.de"
     def __init__(self, timeout: int = 30):
@@ -34,7 +54,7 @@ class AnonFileResolver(AbstractHostResolver):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Cache-Control': 'max-age=0',
@@ -49,14 +69,12 @@ class AnonFileResolver(AbstractHostResolver):
         }
 
     def _build_headers(self, referer_url: str | None = None) -> Dict[str, str]:
-        headers = dict(self.headers)
+        """Solo las cabeceras que dependen del referer; el resto las pone la sesión"""
+        headers = {}
         if referer_url:
             headers['Referer'] = referer_url
             try:
-                parsed = urlparse(referer_url)
-                origin = f"{parsed.scheme}://{parsed.netloc}"
-                headers['Origin'] = origin
-                headers['Host'] = parsed.netloc
+                headers['Origin'], headers['Host'] = _origin_and_host(referer_url)
             except Exception:
                 pass
         return headers
@@ -64,31 +82,32 @@ class AnonFileResolver(AbstractHostResolver):
     async def __aenter__(self):
         # Try to use proxy session; if proxies config/import fails, fall back to direct session
         try:
-            self.session = get_aiohttp_proxy_connector()
+            self.session = get_aiohttp_proxy_connector(headers=self.headers)
         except Exception as e:
             logger.warning(f"Proxy session unavailable, using direct session: {e}")
-            self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout)
+            self.session = create_session(headers=self.headers, timeout=self.timeout)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
             
-    def _extract_form_data(self, soup: BeautifulSoup, form_selector: str = 'form') -> Dict[str, str]:
+    def _extract_form_data(self, html: str) -> Dict[str, str]:
         """Extrae datos de formularios ocultos"""
-        form = soup.find('form')
-        if not form:
+        try:
+            inputs = iter_form_inputs(html)
+            form_data = {}
+            # Una sola pasada: inputs ocultos y el submit method_free tal como está en el formulario
+            for attrs in inputs:
+                name = attrs.get('name')
+                if not name:
+                    continue
+                if attrs.get('type', '').lower() == 'hidden':
+                    form_data[name] = attrs.get('value', '')
+                elif name == 'method_free':
+                    form_data.setdefault(name, attrs.get('value', 'Free Download >>'))
+        except ValueError:
             raise ValueError("No se encontró formulario en la página")
-        form_data = {}
-        for input_tag in form.find_all('input', type='hidden'):
-            name = input_tag.get('name')
-            value = input_tag.get('value', '')
-            if name:
-                form_data[name] = value
-        # Intenta capturar el valor del submit method_free exactamente como está en el formulario
-        submit_btn = form.find('input', attrs={'name': 'method_free'})
-        if submit_btn:
-            form_data['method_free'] = submit_btn.get('value', 'Free Download >>')
         
         return form_data
     
@@ -98,13 +117,13 @@ class AnonFileResolver(AbstractHostResolver):
             return captcha_image.get('src')
         return None
     
-    def _extract_file_info(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _extract_file_info(self, soup: BeautifulSoup, html: str) -> Dict[str, Any]:
         info = {}
         title_element = soup.find('h1', class_='download-title')
         if title_element:
             info['filename'] = title_element.get_text(strip=True)
-        size_text = soup.get_text()
-        size_match = re.search(r'size:\s*(\d+\.?\d*)\s*MB', size_text, re.IGNORECASE)
+        # Busca en el HTML crudo; get_text() solo si el texto está partido por etiquetas
+        size_match = _RE_SIZE_MB.search(html) or _RE_SIZE_MB.search(soup.get_text())
         if size_match:
             info['filesize_mb'] = float(size_match.group(1))
         return info
@@ -128,21 +147,35 @@ class AnonFileResolver(AbstractHostResolver):
                 else:
                     raise ValueError(error)
     
-    def _extract_direct_link(self, soup: BeautifulSoup) -> tuple[str, int]:
+    def _extract_direct_link(self, soup: BeautifulSoup, html: str) -> tuple[str, int]:
         """Extrae el enlace directo y tiempo de expiración de la página final"""
         link_element = soup.find('a', class_='stretched-link')
         self._check_link_element(link_element, soup)
         direct_url = link_element.get('href')
         if not direct_url:
             raise ValueError("Enlace directo vacío")
-        expires_match = re.search(r'next\s+(\d+)\s+hours?', soup.get_text())
+        expires_match = _RE_EXPIRES.search(html) or _RE_EXPIRES.search(soup.get_text())
         expires_hours = int(expires_match.group(1)) if expires_match else 8
         return direct_url, expires_hours
     
+    def _match_stretched_href(self, raw: bytes, pos: int = 0) -> Optional[str]:
+        """href del primer <a class="stretched-link"> a partir de pos, solo con regex"""
+        tag = _RE_STRETCHED.search(raw, pos)
+        href = _RE_HREF.search(tag.group()) if tag else None
+        return unescape(href.group(1).decode('utf-8', 'replace')) if href else None
+
+    def _find_stretched_link(self, raw: bytes) -> Optional[str]:
+        """href del enlace stretched-link; solo construye el árbol si el regex falla"""
+        href = self._match_stretched_href(raw)
+        if href:
+            return href
+        anchor = parse_html(raw, parse_only=_STRAINER_LINKS).find('a', class_='stretched-link')
+        return anchor.get('href') if anchor else None
+    
     def _extract_file_id_from_url(self, url: str) -> str:
         """Extrae el ID del archivo de la URL"""
         # Patrón: anonfile.de/FILEID o anonfile.de/FILEID/filename
-        match = re.search(r'anonfile\.de/([a-zA-Z0-9]+)', url)
+        match = _RE_FILE_ID.search(url)
         return match.group(1) if match else 'unknown'
     
     async def get_download_info(self, anonfile_url: str, retry_no: int = 0) -> DownloadInfo:
@@ -164,27 +197,33 @@ class AnonFileResolver(AbstractHostResolver):
         async with self.session.get(anonfile_url) as response:
             response.raise_for_status()
             html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
             current_url = str(response.url)
-        form_data = self._extract_form_data(soup)
+        form_data = self._extract_form_data(html_content)
+        soup = None
+        if form_data.get('op') == 'download2':
+            # La página ya es la del captcha: no hace falta el POST de la landing
+            soup = parse_html(html_content, parse_only=_STRAINER)
+            if not self._extract_captcha_image(soup):
+                soup = None
         form_data['usr_login'] = ''
         try:
             self.session.cookie_jar.update_cookies({'_pk_ses.1.b0a4': '1'}, response_url=URL(current_url))
         except Exception as e:
             logger.warning(f"Failed to inject _pk_ses.1.b0a4 cookie: {e}")
-        post_headers = self._build_headers(current_url)
-        async with self.session.post(
-            current_url,
-            data=form_data,
-            headers=post_headers,
-        ) as response:
-            response.raise_for_status()
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
-            current_url = str(response.url)
+        if soup is None:
+            post_headers = self._build_headers(current_url)
+            async with self.session.post(
+                current_url,
+                data=form_data,
+                headers=post_headers,
+            ) as response:
+                response.raise_for_status()
+                html_content = await response.text()
+                soup = parse_html(html_content, parse_only=_STRAINER)
+                current_url = str(response.url)
         
-        file_info = self._extract_file_info(soup)
-        form_data_2 = self._extract_form_data(soup)
+        file_info = self._extract_file_info(soup, html_content)
+        form_data_2 = self._extract_form_data(html_content)
         form_data_2['adblock_detected'] = '0'
         
         captcha_image = self._extract_captcha_image(soup)
@@ -193,36 +232,63 @@ class AnonFileResolver(AbstractHostResolver):
             logger.error("No captcha image found")
             raise ValueError("No captcha image found")
         
-        if captcha_image:
-            try:
-                logger.info("Solving captcha")
-                code = await captcha_solver(self.session, captcha_image)
-            except ErrorImageInvalid:
-                logger.error("Error image invalid")
-                if retry_no >= 3:
-                    logger.error("Max retries reached for captcha")
-                    raise ValueError("Max retries reached for captcha")
-                return await self._free_method(anonfile_url, retry_no + 1)
-            form_data_2['code'] = code
-        logger.info("Waiting 17 seconds")
-        await asyncio.sleep(17)
+        # El countdown del servidor empieza al servir esta página: se espera
+        # mientras se resuelve el captcha en lugar de después
+        countdown = asyncio.create_task(asyncio.sleep(17))
+        try:
+            if captcha_image:
+                try:
+                    logger.info("Solving captcha")
+                    code = await captcha_solver(self.session, captcha_image)
+                except ErrorImageInvalid:
+                    logger.error("Error image invalid")
+                    if retry_no >= 3:
+                        logger.error("Max retries reached for captcha")
+                        raise ValueError("Max retries reached for captcha")
+                    countdown.cancel()
+                    return await self._free_method(anonfile_url, retry_no + 1)
+                form_data_2['code'] = code
+            logger.info("Waiting for the 17 second countdown")
+            await countdown
+        finally:
+            countdown.cancel()
         direct_url = None
+        # Mismas cabeceras para el POST del captcha y sus reintentos
+        second_headers = self._build_headers(current_url)
         async def send_form_data(url, data):
-            second_headers = self._build_headers(current_url)
+            """
+            Lee la respuesta por trozos y corta en cuanto aparece el enlace.
+            Devuelve (href, cuerpo leído, charset); href es None si no apareció.
+            """
+            buf = bytearray()
             async with self.session.post(
                 url,
                 data=data,
                 headers=second_headers,
             ) as response:
-                html_content = await response.text()
-                soup = BeautifulSoup(html_content, 'html.parser')
-            return soup
+                async for chunk in response.content.iter_chunked(8192):
+                    # Una etiqueta partida entre trozos empieza en el último '<' ya leído
+                    pos = max(buf.rfind(b'<'), 0)
+                    buf += chunk
+                    href = self._match_stretched_href(buf, pos)
+                    if href:
+                        return href, bytes(buf), response.charset
+                return None, bytes(buf), response.charset
         
         
         while True:
             try:
-                soup = await send_form_data(anonfile_url, form_data_2)
-                direct_url, expires_hours = self._extract_direct_link(soup)
+                direct_url, raw, charset = await send_form_data(anonfile_url, form_data_2)
+                if direct_url:
+                    break
+                # Los errores de reintento se reconocen en los bytes, sin construir el árbol
+                if b'Wrong captcha' in raw:
+                    raise WrongCaptcha("Wrong captcha")
+                if b'Skipped countdown' in raw:
+                    raise TimeoutSkipped("Skipped countdown")
+                html_content = raw.decode(charset or 'utf-8', 'replace')
+                soup = parse_html(html_content, parse_only=_STRAINER)
+                direct_url, expires_hours = self._extract_direct_link(soup, html_content)
                 if direct_url:
                     break
             except WrongCaptcha:
@@ -234,12 +300,9 @@ class AnonFileResolver(AbstractHostResolver):
                     raise ValueError("Max retries reached for captcha")
                 await asyncio.sleep(retry_no)
                 
-        headers_info = {}
-        async with self.session.head(direct_url) as response:
-            headers_info = dict(response.headers)
-            if 'Content-Length' in headers_info:
-                filesize_bytes = int(headers_info['Content-Length'])
-                file_info['filesize'] = filesize_bytes
+        filesize_bytes, headers_info = await probe_content_length(self.session, direct_url)
+        if filesize_bytes is not None:
+            file_info['filesize'] = filesize_bytes
     
         download_info = DownloadInfo(
             filename=file_info.get('filename'),
@@ -278,19 +341,12 @@ class AnonFileResolver(AbstractHostResolver):
             
         async with self.session.post(anonfile_url, data=data, cookies=cookies) as response:
             response.raise_for_status()
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            raw = await response.read()
             
-        anchor = soup.find('a', class_='stretched-link')
-        if not anchor:
+        direct_url = self._find_stretched_link(raw)
+        if not direct_url:
             raise ValueError("Request failed, direct link not found")
-        direct_url = anchor.get('href')
-        headers_info = {}
-        async with self.session.head(direct_url) as response:
-            headers_info = dict(response.headers)
-            if 'Content-Length' in headers_info:
-                filesize_bytes = int(headers_info['Content-Length'])
-                
+        filesize_bytes, headers_info = await probe_content_length(self.session, direct_url)
 
         
         download_info = DownloadInfo(
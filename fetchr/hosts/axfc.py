@@ -1,20 +1,30 @@
 import aiohttp
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 import logging
-from bs4 import BeautifulSoup
+from .common import debug_dump, find_link_href, parse_html, probe_content_length
 from urllib.parse import urlparse
 from typing import Callable, Awaitable
 import asyncio
 import os
 import aiofiles
 from pathlib import Path
-import random
+from secrets import token_hex
 from fetchr.config import CAPTCHAS_DIR
+from fetchr.network import create_session
+
+try:
+    from watchfiles import awatch
+except ImportError:  # optional: fall back to polling the captchas dir
+    awatch = None
+
+# Poll interval when watchfiles isn't installed
+CAPTCHA_POLL_INTERVAL = 0.1
+
+_CLEANUP_TASKS: set = set()
 
 def generate_random_id(length: int = 10):
-    chars = "abcdefghijklmnopqrstuvwxyz"
-    return "".join(random.choices(chars, k=length))
+    return token_hex((length + 1) // 2)[:length]
 
 
 logger = logging.getLogger("downloader.axfc")
@@ -24,6 +34,30 @@ class ErrorImageInvalid(Exception):
     """Exception raised when image is invalid"""
     pass
 
+async def _wait_for_file(path: Path):
+    """Return once path exists, woken by filesystem events when watchfiles is available."""
+    if path.exists():
+        return
+    if awatch is not None:
+        # yield_on_timeout: re-check every second in case the file appeared
+        # before the watcher was set up
+        async for _ in awatch(path.parent, recursive=False, rust_timeout=1000, yield_on_timeout=True):
+            if path.exists():
+                return
+    while not path.exists():
+        await asyncio.sleep(CAPTCHA_POLL_INTERVAL)
+
+def _unlink_all(paths) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+def _remove_in_background(*paths: Path) -> None:
+    """Delete solved captcha files in a worker thread without waiting for it."""
+    task = asyncio.create_task(asyncio.to_thread(_unlink_all, paths))
+    # Keep a reference until it finishes so the task isn't garbage-collected
+    _CLEANUP_TASKS.add(task)
+    task.add_done_callback(_CLEANUP_TASKS.discard)
+
 async def captcha_solver(session: aiohttp.ClientSession, captcha_url: str) -> str:
     id = generate_random_id()
     image_path = Path(f"{CAPTCHAS_DIR}/{id}.jpg")
@@ -40,20 +74,22 @@ async def captcha_solver(session: aiohttp.ClientSession, captcha_url: str) -> st
             await f.write(image)
     code = None
     while not code:
-        if text_path.exists():
-            async with aiofiles.open(text_path, "r") as f:
-                text = await f.read()
-                code = text.strip()
-        await asyncio.sleep(1)
-    image_path.unlink()
-    text_path.unlink()
+        await _wait_for_file(text_path)
+        async with aiofiles.open(text_path, "r") as f:
+            text = await f.read()
+            code = text.strip()
+        if not code:
+            # File created but not written yet
+            await asyncio.sleep(CAPTCHA_POLL_INTERVAL)
+    _remove_in_background(image_path, text_path)
     return code
 
+@register_resolver
 class AxfcResolver(AbstractHostResolver):
     host = "axfc.net"
     async def __aenter__(self):
         print("Entering AxfcResolver")
-        self.session = aiohttp.ClientSession()
+        self.session = create_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -67,8 +103,7 @@ class AxfcResolver(AbstractHostResolver):
         response = await self.session.get(url)
         response.raise_for_status()
         print(response)
-        html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(await response.read(), response.charset)
         
         # GET BASIC INFO
         filename = soup.select_one(".comme p").text
@@ -100,19 +135,10 @@ class AxfcResolver(AbstractHostResolver):
             print(f"Captcha failed for {url}")
             return await self.get_download_info(url)
         
-        with open("axfc_html.html", "w", encoding="utf-8") as f:
-            f.write(html)
+        debug_dump("axfc_html.html", html)
+        
+        final_page = find_link_href(html, "Download")
         
-        soup = BeautifulSoup(html, "html.parser")
-        final_page = None
-        for a in soup.find_all("a"):
-            print(a.text)
-            if "Download" in a.text:
-                print("matched")
-                download_url = a.get("href")
-                final_page = download_url
-                break
-            
         # remove first . from final_page
         final_page = final_page[1:]
         print(f"base_url: {base_url}, final_page: {final_page}")
@@ -120,19 +146,12 @@ class AxfcResolver(AbstractHostResolver):
             "Content-Type": "application/x-www-form-urlencoded"
         })
         response.raise_for_status()
-        html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        download_url = None
-        for a in soup.find_all("a"):
-            if "download" in a.text:
-                download_url = a.get("href")
-                break
+        download_url = find_link_href(await response.read(), "download", response.charset)
         
         if not download_url:
             raise ValueError("No download link found")
         
-        response = await self.session.head(download_url)
-        size = int(response.headers.get("Content-Length"))
+        size, _ = await probe_content_length(self.session, download_url)
         
         return DownloadInfo(
             filename=filename,
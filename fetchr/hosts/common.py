@@ -1,11 +1,232 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Any
+import codecs
+import posixpath
+from email.message import Message
+from email.utils import collapse_rfc2231_value
+from html import unescape
+from urllib.parse import urlsplit
+from types import MappingProxyType
+from typing import Dict, Iterator, Optional, Any, Tuple
 import asyncio
+import os
+import re
 import aiohttp
-from bs4 import BeautifulSoup, Tag
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from ..types import DownloadInfo
 from ..host_resolver import AbstractHostResolver
-from ..network import get_aiohttp_proxy_connector
+from ..network import ACCEPT_ENCODING, get_aiohttp_proxy_connector
+
+_RE_FORM = re.compile(r'<form\b.*?</form\s*>', re.IGNORECASE | re.DOTALL)
+_RE_INPUT = re.compile(r'<input\b[^>]*>', re.IGNORECASE)
+_RE_CONTENT_RANGE_TOTAL = re.compile(r'/\s*(\d+)\s*$')
+_RE_ATTR = re.compile(r'''(?<![\w-])([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+_XPATH_FIRST_FORM = etree.XPath("(//form)[1]")
+_XPATH_LINK_BY_TEXT = etree.XPath("//a[contains(., $text)]/@href")
+
+def parse_html(
+    html, encoding: Optional[str] = None, parse_only: Optional[SoupStrainer] = None
+) -> BeautifulSoup:
+    """
+    Parse a page with the C-backed lxml parser.
+
+    Pass the raw response bytes (and response.charset as encoding) when the
+    text itself isn't needed: lxml decodes them once, with no str copy.
+    parse_only (a SoupStrainer) keeps only the matching elements, so the
+    rest of the page never becomes tree nodes.
+    """
+    if encoding and isinstance(html, bytes):
+        soup = BeautifulSoup(html, 'lxml', from_encoding=encoding, parse_only=parse_only)
+        try:
+            wanted = codecs.lookup(encoding).name
+        except LookupError:
+            return soup
+        if soup.original_encoding and codecs.lookup(soup.original_encoding).name == wanted:
+            return soup
+        # lxml doesn't know every alias (e.g. "latin-1"): decode it ourselves
+        return BeautifulSoup(html.decode(encoding, 'replace'), 'lxml', parse_only=parse_only)
+    return BeautifulSoup(html, 'lxml', parse_only=parse_only)
+
+def parse_tree(html, encoding: Optional[str] = None) -> lxml.html.HtmlElement:
+    """
+    Parse a page into a bare lxml.html tree, for XPath lookups that don't
+    need BeautifulSoup's Tag objects.
+    """
+    parser = None
+    if encoding and isinstance(html, bytes):
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding)
+        except LookupError:
+            # lxml doesn't know every alias (e.g. "latin-1"): decode it ourselves
+            html = html.decode(encoding, 'replace')
+    return lxml.html.document_fromstring(html, parser=parser)
+
+async def parse_tree_stream(
+    response: aiohttp.ClientResponse, chunk_size: int = 16384
+) -> Tuple[lxml.html.HtmlElement, bytes]:
+    """
+    parse_tree() fed chunk by chunk while the body is still arriving, so
+    parsing overlaps the download. Also returns the raw body (for dumps).
+    """
+    charset = response.charset
+    decoder = None
+    try:
+        parser = lxml.html.HTMLParser(encoding=charset) if charset else lxml.html.HTMLParser()
+    except LookupError:
+        # lxml doesn't know every alias (e.g. "latin-1"): decode it ourselves
+        parser = lxml.html.HTMLParser()
+        decoder = codecs.getincrementaldecoder(charset)('replace')
+    chunks = []
+    async for chunk in response.content.iter_chunked(chunk_size):
+        chunks.append(chunk)
+        parser.feed(decoder.decode(chunk) if decoder else chunk)
+    if decoder:
+        parser.feed(decoder.decode(b'', final=True))
+    root = parser.close()
+    if root is None:  # empty body
+        root = lxml.html.document_fromstring('<html></html>')
+    return root, b''.join(chunks)
+
+def element_to_tag(element: lxml.html.HtmlElement) -> Tag:
+    """Re-parse a single lxml element as a bs4 Tag (for the captcha solver)."""
+    return parse_html(lxml.html.tostring(element, with_tail=False)).find(element.tag)
+
+def tree_hidden_inputs(tree: lxml.html.HtmlElement) -> Dict[str, str]:
+    """extract_hidden_inputs() for an already parsed lxml tree."""
+    forms = _XPATH_FIRST_FORM(tree)
+    if not forms:
+        raise ValueError("No form found in page")
+    return {
+        input_tag.get('name'): input_tag.get('value', '')
+        for input_tag in forms[0].iter('input')
+        if (input_tag.get('type') or '').lower() == 'hidden' and input_tag.get('name')
+    }
+
+def find_link_href(html, text: str, encoding: Optional[str] = None) -> Optional[str]:
+    """
+    href of the first <a> whose text contains text, matched by an lxml
+    XPath query instead of walking every anchor of a soup.
+    """
+    hrefs = _XPATH_LINK_BY_TEXT(parse_tree(html, encoding), text=text)
+    return str(hrefs[0]) if hrefs else None
+
+def filename_from_url(url: str) -> str:
+    """Last path segment of url, without its query string or fragment."""
+    return posixpath.basename(urlsplit(url).path)
+
+def filename_from_content_disposition(value: Optional[str]) -> Optional[str]:
+    """
+    filename of a Content-Disposition header, or None. An RFC 5987
+    filename*= value wins over a plain filename=, as RFC 6266 asks.
+    """
+    if not value:
+        return None
+    msg = Message()
+    msg['Content-Disposition'] = value
+    filename = None
+    for key, param in msg.get_params(header='content-disposition')[1:]:
+        if key.lower() != 'filename':
+            continue
+        if isinstance(param, tuple):
+            return collapse_rfc2231_value(param)
+        filename = filename or param
+    return filename
+
+def debug_dump(name: str, content) -> None:
+    """
+    Write a fetched page to name for debugging, only when FETCHR_DEBUG_DUMP=1.
+    Accepts str or the raw response bytes.
+    """
+    if os.getenv("FETCHR_DEBUG_DUMP") != "1":
+        return
+    if isinstance(content, bytes):
+        with open(name, 'wb') as f:
+            f.write(content)
+    else:
+        with open(name, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+def iter_form_inputs(html: str) -> Iterator[Dict[str, str]]:
+    """
+    Yield the attributes of every <input> in the first <form> of html,
+    scanned with regexes instead of building a soup.
+    """
+    form = _RE_FORM.search(html)
+    if form is None:
+        raise ValueError("No form found in page")
+    for tag in _RE_INPUT.finditer(form.group()):
+        attrs = {}
+        for name, dq, sq, bare in _RE_ATTR.findall(tag.group()):
+            attrs.setdefault(name.lower(), unescape(dq or sq or bare))
+        yield attrs
+
+def extract_hidden_inputs(html: str) -> Dict[str, str]:
+    """Hidden form data (name -> value) of the first <form> in html."""
+    return {
+        attrs['name']: attrs.get('value', '')
+        for attrs in iter_form_inputs(html)
+        if attrs.get('type', '').lower() == 'hidden' and attrs.get('name')
+    }
+
+async def probe_content_length(
+    session: aiohttp.ClientSession, url: str, head_fallback: bool = True, **kwargs
+) -> Tuple[Optional[int], Dict[str, str]]:
+    """
+    Total size of url and the response headers, as a HEAD would report them.
+
+    Asks for the first byte with a redirect-following GET and reads the
+    total from Content-Range (or Content-Length when the server ignores
+    the range), releasing the body unread. Falls back to HEAD if neither
+    header comes back, unless the GET already answered 404/410.
+
+    With head_fallback=False (the caller's HEAD was already refused) an
+    error status raises ClientResponseError, and an unknown total gives
+    None with the GET's own headers.
+    """
+    headers = {**kwargs.pop('headers', {}), 'Range': 'bytes=0-0'}
+    async with session.get(url, headers=headers, allow_redirects=True, **kwargs) as response:
+        if not head_fallback:
+            response.raise_for_status()
+        # Case-insensitive multidict lookups; a plain dict is only built to return
+        response_headers = response.headers
+        response.release()
+    size = None
+    content_range = response_headers.get('Content-Range')
+    if response.status == 206 and content_range:
+        match = _RE_CONTENT_RANGE_TOTAL.search(content_range)
+        if match:
+            size = int(match.group(1))
+    elif response.status == 200 and 'Content-Length' in response_headers:
+        size = int(response_headers['Content-Length'])
+    if size is not None:
+        headers_info = {
+            k: v for k, v in response_headers.items()
+            if k.lower() not in ('content-range', 'content-length')
+        }
+        headers_info['Content-Length'] = str(size)
+        return size, headers_info
+    if not head_fallback or response.status in (404, 410):
+        # Gone for a HEAD too: don't spend another round trip on it
+        return None, dict(response_headers)
+
+    async with session.head(url, **kwargs) as response:
+        response_headers = response.headers
+    # An error page's Content-Length is not the file size
+    if response.status < 400 and 'Content-Length' in response_headers:
+        size = int(response_headers['Content-Length'])
+    return size, dict(response_headers)
+
+# Browser-like defaults shared (read-only) by the form-based resolvers. No
+# Content-Type: aiohttp sets the form one itself when posting a dict.
+BROWSER_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+})
 
 class BaseFormHostResolver(AbstractHostResolver):
     """
@@ -18,15 +239,7 @@ class BaseFormHostResolver(AbstractHostResolver):
         self.timeout_val = timeout
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.session: Optional[aiohttp.ClientSession] = None
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+        self.headers = BROWSER_HEADERS
 
     async def __aenter__(self):
         # Prefer the proxy connector if available/configured, otherwise use standard.
@@ -35,9 +248,7 @@ class BaseFormHostResolver(AbstractHostResolver):
         # We will default to get_aiohttp_proxy_connector() as it likely handles
         # standard connection if no proxy is set, or we can fallback.
         # Assuming get_aiohttp_proxy_connector returns a Session object based on previous usage in filedot.py
-        self.session = get_aiohttp_proxy_connector()
-        if self.session and self.headers:
-            self.session._default_headers.update(self.headers)
+        self.session = get_aiohttp_proxy_connector(headers=self.headers)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -68,4 +279,4 @@ class BaseFormHostResolver(AbstractHostResolver):
             if response.status != 200:
                  raise ValueError(f"Failed to fetch {url}: Status {response.status}")
             html = await response.text()
-            return BeautifulSoup(html, 'html.parser')
+            return parse_html(html)
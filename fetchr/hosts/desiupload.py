@@ -1,12 +1,18 @@
 import logging
 import asyncio
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from ..types import DownloadInfo
-from .common import BaseFormHostResolver
+from .common import BaseFormHostResolver, debug_dump, extract_hidden_inputs, filename_from_url, parse_html, probe_content_length
+from ..host_resolver import register_resolver
 from fetchr.captcha import solve_css_position_captcha
 
 logger = logging.getLogger(__file__)
 
+# Only the captcha block and the direct-link block are ever queried
+_CAPTCHA_STRAINER = SoupStrainer(id='commonId')
+_LINK_STRAINER = SoupStrainer(id='direct_link')
+
+@register_resolver
 class DesiUploadResolver(BaseFormHostResolver):
     host = "desiupload.co"
     async def get_download_info(self, url: str) -> DownloadInfo:
@@ -16,9 +22,8 @@ class DesiUploadResolver(BaseFormHostResolver):
         async with self.session.get(url) as response:
             response.raise_for_status()
             html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
         
-        form_data = self._extract_form_data(soup)
+        form_data = extract_hidden_inputs(html_content)
         form_data['method_free'] = 'Liberta Descarga'
         
         async with self.session.post(url, data=form_data, headers={
@@ -28,9 +33,8 @@ class DesiUploadResolver(BaseFormHostResolver):
                 raise ValueError(f"Error en paso 2: {response.status}")
             
             html_content = await response.text()
-            with open('filedot_countdown.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            soup = BeautifulSoup(html_content, 'html.parser')
+            debug_dump('filedot_countdown.html', html_content)
+            soup = parse_html(html_content, parse_only=_CAPTCHA_STRAINER)
         
         
         
@@ -39,24 +43,26 @@ class DesiUploadResolver(BaseFormHostResolver):
         
         # get captcha
         
-        captcha_div = soup.select_one("#commonId table tr td div")
-        if not captcha_div:
-            raise ValueError("No captcha div found")
-        form_data = self._extract_form_data(soup)
-        form_data['adblock_detected'] = '0'
-        captcha_code = solve_css_position_captcha(captcha_div)
-        form_data['code'] = str(captcha_code)
+        # Countdown runs from when the page was served, alongside the captcha work
+        countdown = asyncio.create_task(asyncio.sleep(15))
+        try:
+            captcha_div = soup.select_one("#commonId table tr td div")
+            if not captcha_div:
+                raise ValueError("No captcha div found")
+            form_data = extract_hidden_inputs(html_content)
+            form_data['adblock_detected'] = '0'
+            captcha_code = solve_css_position_captcha(captcha_div)
+            form_data['code'] = str(captcha_code)
 
-        # await 7 seconds
-        await asyncio.sleep(15)
+            await countdown
+        finally:
+            countdown.cancel()
         
         async with self.session.post(url, data=form_data) as response:
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            raw = await response.read()
+            soup = parse_html(raw, response.charset, parse_only=_LINK_STRAINER)
             
-            # save html
-            with open('filedot_download.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            debug_dump('filedot_download.html', raw)
         
         anchor = soup.select_one("#direct_link a")
         if not anchor:
@@ -67,15 +73,11 @@ class DesiUploadResolver(BaseFormHostResolver):
              raise ValueError("Invalid download link")
              
         # extract filename from direct_url
-        filename = direct_url.split("/")[-1]
+        filename = filename_from_url(direct_url)
         print(direct_url)
-        filesize = 0
-        async with self.session.head(direct_url) as response:
-            if 'Content-Length' in response.headers:
-                filesize_bytes = int(response.headers['Content-Length'])
-                filesize = filesize_bytes
-            else:
-                raise ValueError("No filesize found")
+        filesize, _ = await probe_content_length(self.session, direct_url)
+        if filesize is None:
+            raise ValueError("No filesize found")
 
         download_info = DownloadInfo(
             filename=filename,
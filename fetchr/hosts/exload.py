@@ -1,46 +1,62 @@
 import aiohttp
 import asyncio
 import logging
-from bs4 import BeautifulSoup
-from typing import Dict
+import lxml.html
+from lxml import etree
+from .common import BROWSER_HEADERS, debug_dump, element_to_tag, filename_from_url, parse_tree_stream, probe_content_length
+from typing import Dict, Optional
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
-from fetchr.network import get_aiohttp_proxy_connector, get_random_proxy
+from ..host_resolver import AbstractHostResolver, register_resolver
+from fetchr.network import create_session, get_random_proxy
 from fetchr.captcha import solve_css_position_captcha
 
 logger = logging.getLogger("fetchr.hosts.exload")
 
 EXLOAD_COUNTDOWN_SECONDS = 60
 
-
+# (compiled XPath, CSS equivalent for the logs), tried in order
+_CAPTCHA_XPATHS = (
+    (etree.XPath("//*[@id='countover1']//table//tr//td//div"), "#countover1 table tr td div"),
+    (etree.XPath("//table//tr//td//div[contains(@style, 'background:#ccc')]"), "table tr td div[style*='background:#ccc']"),
+)
+_ANCHOR_XPATHS = (
+    (etree.XPath("//table//a[contains(@href, '://')]"), "table a[href*='://']"),
+    (etree.XPath("//*[@id='direct_link']//a"), "#direct_link a"),
+    (etree.XPath("//a[contains(concat(' ', normalize-space(@class), ' '), ' downloadbtn ')]"), "a.downloadbtn"),
+)
+_F1_FORM_XPATH = etree.XPath("//form[@name='F1']")
+_DOWNLOAD2_FORM_XPATH = etree.XPath("//input[@name='op' and @value='download2']/ancestor::form[1]")
+
+
+def _first_match(tree: lxml.html.HtmlElement, xpaths, step: str) -> Optional[lxml.html.HtmlElement]:
+    for xpath, css in xpaths:
+        found = xpath(tree)
+        if found:
+            logger.debug(f"[{step}] Found element with selector: {css}")
+            return found[0]
+    return None
+
+
+@register_resolver
 class ExloadResolver(AbstractHostResolver):
     host = "ex-load.com"
-    def __init__(self, timeout: int = 120, skip_countdown: bool = False, max_retries: int = 5):
+    def __init__(self, timeout: int = 120, skip_countdown: bool = False, max_retries: int = 2):
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.skip_countdown = skip_countdown
         self.max_retries = max_retries
         self.proxy = None
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+        self.headers = BROWSER_HEADERS
         self.session = None
 
     async def __aenter__(self):
         logger.debug("Initializing ExloadResolver session")
         self.proxy = get_random_proxy()
-        connector = aiohttp.TCPConnector()
         if self.proxy:
             logger.debug(f"Using proxy: {self.proxy}")
-            self.session = aiohttp.ClientSession(connector=connector, proxy=self.proxy)
+            self.session = create_session(proxy=self.proxy, headers=self.headers, timeout=self.timeout)
         else:
             logger.debug("No proxy available, using direct connection")
-            self.session = aiohttp.ClientSession(connector=connector)
+            self.session = create_session(headers=self.headers, timeout=self.timeout)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -48,74 +64,94 @@ class ExloadResolver(AbstractHostResolver):
             logger.debug("Closing ExloadResolver session")
             await self.session.close()
 
-    def _extract_download_form_data(self, soup: BeautifulSoup) -> Dict[str, str]:
-        form = soup.find('form', attrs={'name': 'F1'})
-        if not form:
-            form = soup.find('input', attrs={'name': 'op', 'value': 'download2'})
-            if form:
-                form = form.find_parent('form')
+    def _extract_download_form_data(self, tree: lxml.html.HtmlElement) -> Dict[str, str]:
+        forms = _F1_FORM_XPATH(tree)
+        if not forms:
+            forms = _DOWNLOAD2_FORM_XPATH(tree)
         
-        if not form:
+        if not forms:
             raise ValueError("Download form (F1/download2) not found")
 
         form_data = {}
-        for input_tag in form.find_all('input'):
+        for input_tag in forms[0].iter('input'):
             name = input_tag.get('name')
-            value = input_tag.get('value', '')
             if name:
-                form_data[name] = value
+                form_data[name] = input_tag.get('value', '')
         
         logger.debug(f"Extracted download form data: {form_data}")
         return form_data
 
-    async def get_download_info(self, url: str) -> DownloadInfo:
-        if not self.session:
-            raise RuntimeError("Use within context manager: async with ExloadResolver() as resolver:")
-
-        logger.info(f"[STEP 1] Processing URL: {url}")
-
-        logger.debug(f"[STEP 1] Sending GET request to: {url}")
-        response = await self.session.get(url, headers=self.headers)
-        logger.debug(f"[STEP 1] Response status: {response.status}")
-        response.raise_for_status()
-        html_content = await response.text()
-        logger.debug(f"[STEP 1] Received HTML length: {len(html_content)} bytes")
-        soup = BeautifulSoup(html_content, 'html.parser')
-
+    def _build_captcha_form(self, tree: lxml.html.HtmlElement, html_content: bytes) -> Dict[str, str]:
+        """Download form data with the CSS-position captcha solved."""
         logger.debug("[STEP 2] Looking for captcha div...")
-        captcha_div = soup.select_one("#countover1 table tr td div")
-        if captcha_div:
-            logger.debug("[STEP 2] Found captcha div with selector: #countover1 table tr td div")
-        else:
-            captcha_div = soup.select_one("table tr td div[style*='background:#ccc']")
-            if captcha_div:
-                logger.debug("[STEP 2] Found captcha div with selector: table tr td div[style*='background:#ccc']")
+        captcha_div = _first_match(tree, _CAPTCHA_XPATHS, "STEP 2")
         
-        if not captcha_div:
-            logger.error("[STEP 2] Captcha div not found! Saving HTML for debug...")
-            with open("exload_debug.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
-            logger.error("[STEP 2] HTML saved to exload_debug.html")
+        if captcha_div is None:
+            logger.error("[STEP 2] Captcha div not found! (FETCHR_DEBUG_DUMP=1 saves the page to exload_debug.html)")
+            debug_dump("exload_debug.html", html_content)
             raise ValueError("Captcha div not found")
 
+        captcha_div = element_to_tag(captcha_div)
         logger.debug(f"[STEP 2] Captcha div HTML: {captcha_div}")
 
-        form_data = self._extract_download_form_data(soup)
+        form_data = self._extract_download_form_data(tree)
         form_data['adblock_detected'] = '0'
         captcha_code = solve_css_position_captcha(captcha_div)
         logger.info(f"[STEP 2] Solved captcha code: {captcha_code}")
         form_data['code'] = captcha_code
         logger.debug(f"[STEP 2] Form data for POST: {form_data}")
+        return form_data
 
-        if self.skip_countdown:
-            logger.warning(f"[STEP 3] SKIPPING countdown (skip_countdown=True)")
-        else:
-            logger.info(f"[STEP 3] Waiting {EXLOAD_COUNTDOWN_SECONDS} seconds...")
-            await asyncio.sleep(EXLOAD_COUNTDOWN_SECONDS)
-            logger.debug("[STEP 3] Countdown finished")
+    async def _probe_size(self, url: str) -> Optional[int]:
+        """
+        File size from a one-byte ranged GET. The link can 404 for a moment
+        right after the captcha POST, so retry up to max_retries times with
+        exponential backoff.
+        """
+        for attempt in range(self.max_retries + 1):
+            logger.debug(f"[STEP 6] Probing file size, attempt {attempt + 1}/{self.max_retries + 1}")
+            filesize, _ = await probe_content_length(self.session, url, ssl=False)
+            if filesize is not None:
+                logger.info(f"[STEP 6] File size: {filesize} bytes ({filesize / 1024 / 1024:.2f} MB)")
+                return filesize
+            if attempt < self.max_retries:
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"[STEP 6] File size unavailable, retrying in {delay}s...")
+                await asyncio.sleep(delay)
+        return None
+
+    async def get_download_info(self, url: str) -> DownloadInfo:
+        if not self.session:
+            raise RuntimeError("Use within context manager: async with ExloadResolver() as resolver:")
+
+        logger.info(f"[STEP 1] Processing URL: {url}")
+
+        logger.debug(f"[STEP 1] Sending GET request to: {url}")
+        response = await self.session.get(url)
+        logger.debug(f"[STEP 1] Response status: {response.status}")
+        response.raise_for_status()
+
+        # The server's countdown runs from when the page was served: start ours
+        # now so it overlaps reading, parsing and the captcha work
+        countdown = None
+        if not self.skip_countdown:
+            countdown = asyncio.create_task(asyncio.sleep(EXLOAD_COUNTDOWN_SECONDS))
+        try:
+            tree, html_content = await parse_tree_stream(response)
+            logger.debug(f"[STEP 1] Received HTML length: {len(html_content)} bytes")
+            form_data = self._build_captcha_form(tree, html_content)
+            if countdown is None:
+                logger.warning(f"[STEP 3] SKIPPING countdown (skip_countdown=True)")
+            else:
+                logger.info(f"[STEP 3] Waiting for the {EXLOAD_COUNTDOWN_SECONDS} second countdown...")
+                await countdown
+                logger.debug("[STEP 3] Countdown finished")
+        finally:
+            if countdown is not None:
+                countdown.cancel()
 
         logger.info("[STEP 4] Submitting form with captcha")
-        async with self.session.post(url, data=form_data, headers=self.headers, allow_redirects=False) as response:
+        async with self.session.post(url, data=form_data, allow_redirects=False) as response:
             logger.debug(f"[STEP 4] Response status: {response.status}")
             logger.debug(f"[STEP 4] Response headers: {dict(response.headers)}")
             
@@ -123,29 +159,13 @@ class ExloadResolver(AbstractHostResolver):
                 direct_url = response.headers.get('Location')
                 logger.info(f"[STEP 4] Redirect detected to: {direct_url}")
                 if direct_url:
-                    filename = direct_url.split("/")[-1]
+                    filename = filename_from_url(direct_url)
                     logger.info(f"[STEP 5] Filename: {filename}")
                     
-                    logger.debug(f"[STEP 6] Sending HEAD request with up to {self.max_retries} retries...")
-                    filesize = 0
-                    for attempt in range(self.max_retries):
-                        async with self.session.head(direct_url, ssl=False, headers=self.headers) as head_response:
-                            logger.debug(f"[STEP 6] Attempt {attempt + 1}/{self.max_retries}: HEAD response status: {head_response.status}")
-                            if head_response.status == 200:
-                                if 'Content-Length' in head_response.headers:
-                                    filesize = int(head_response.headers['Content-Length'])
-                                    logger.info(f"[STEP 6] File size: {filesize} bytes ({filesize / 1024 / 1024:.2f} MB)")
-                                else:
-                                    logger.warning("[STEP 6] Content-Length header not found")
-                                break
-                            elif head_response.status == 404:
-                                logger.warning(f"[STEP 6] 404 on attempt {attempt + 1}, retrying...")
-                                await asyncio.sleep(0.5)
-                            else:
-                                logger.warning(f"[STEP 6] Unexpected status {head_response.status}")
-                                break
-                    else:
-                        logger.warning(f"[STEP 6] All {self.max_retries} retries exhausted, proceeding with filesize=0")
+                    filesize = await self._probe_size(direct_url)
+                    if filesize is None:
+                        logger.warning("[STEP 6] File size unavailable, proceeding with filesize=0")
+                        filesize = 0
                     
                     logger.info("[DONE] Successfully resolved download info via redirect")
                     return DownloadInfo(
@@ -156,43 +176,25 @@ class ExloadResolver(AbstractHostResolver):
                     )
             
             response.raise_for_status()
-            html_content = await asyncio.wait_for(response.text(), timeout=30)
+            tree, html_content = await parse_tree_stream(response)
             logger.debug(f"[STEP 4] Received HTML length: {len(html_content)} bytes")
-            soup = BeautifulSoup(html_content, 'html.parser')
 
         logger.debug("[STEP 5] Looking for direct download link...")
-        anchor = soup.select_one("table a[href*='://']")
-        if anchor:
-            logger.debug("[STEP 5] Found anchor with selector: table a[href*='://']")
-        else:
-            anchor = soup.select_one("#direct_link a")
-            if anchor:
-                logger.debug("[STEP 5] Found anchor with selector: #direct_link a")
-            else:
-                anchor = soup.select_one("a.downloadbtn")
-                if anchor:
-                    logger.debug("[STEP 5] Found anchor with selector: a.downloadbtn")
+        anchor = _first_match(tree, _ANCHOR_XPATHS, "STEP 5")
         
-        if not anchor:
-            logger.error("[STEP 5] Direct download link not found! Saving HTML for debug...")
-            with open("exload_final_debug.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
-            logger.error("[STEP 5] HTML saved to exload_final_debug.html")
+        if anchor is None:
+            logger.error("[STEP 5] Direct download link not found! (FETCHR_DEBUG_DUMP=1 saves the page to exload_final_debug.html)")
+            debug_dump("exload_final_debug.html", html_content)
             raise ValueError("Direct download link not found")
 
         direct_url = anchor.get("href")
-        filename = direct_url.split("/")[-1]
+        filename = filename_from_url(direct_url)
         logger.info(f"[STEP 5] Direct URL: {direct_url}")
         logger.info(f"[STEP 5] Filename: {filename}")
 
-        logger.debug("[STEP 6] Sending HEAD request to get file size...")
-        async with self.session.head(direct_url, ssl=False, headers=self.headers) as response:
-            logger.debug(f"[STEP 6] HEAD response status: {response.status}")
-            logger.debug(f"[STEP 6] HEAD response headers: {dict(response.headers)}")
-            if 'Content-Length' not in response.headers:
-                raise ValueError("Content-Length header not found")
-            filesize = int(response.headers['Content-Length'])
-            logger.info(f"[STEP 6] File size: {filesize} bytes ({filesize / 1024 / 1024:.2f} MB)")
+        filesize = await self._probe_size(direct_url)
+        if filesize is None:
+            raise ValueError("Content-Length header not found")
 
         logger.info("[DONE] Successfully resolved download info")
         return DownloadInfo(
@@ -1,12 +1,22 @@
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from typing import Dict
 from ..types import DownloadInfo
-from ..types import DownloadInfo
-from .common import BaseFormHostResolver
+from .common import (
+    BaseFormHostResolver,
+    element_to_tag,
+    extract_hidden_inputs,
+    filename_from_url,
+    parse_tree_stream,
+    probe_content_length,
+    tree_hidden_inputs,
+)
+from ..host_resolver import register_resolver
+from lxml import etree
 from fetchr.captcha import solve_css_position_captcha
 
+_CAPTCHA_XPATH = etree.XPath("//*[@id='commonId']//table//tr//td//div")
+_LINK_XPATH = etree.XPath("//table//a")
+
+@register_resolver
 class FiledotResolver(BaseFormHostResolver):
     host = "file.dot"
     
@@ -24,52 +34,51 @@ class FiledotResolver(BaseFormHostResolver):
         response = await self.session.get(url)
         response.raise_for_status()
         html_content = await response.text()
-        soup = BeautifulSoup(html_content, 'html.parser')
-        form_data = self._extract_form_data(soup)
+        form_data = extract_hidden_inputs(html_content)
         form_data['method_free'] = 'Liberta Descarga'
         
-        async with self.session.post(url, data=form_data, headers={
-            'Content-Type': 'application/x-www-form-urlencoded',
-            }) as response:
-            if response.status != 200:
-                raise ValueError(f"Error en paso 2: {response.status}")
+        countdown = None
+        try:
+            async with self.session.post(url, data=form_data, headers={
+                'Content-Type': 'application/x-www-form-urlencoded',
+                }) as response:
+                if response.status != 200:
+                    raise ValueError(f"Error en paso 2: {response.status}")
+                # Countdown runs from when the page was served, alongside the captcha work
+                countdown = asyncio.create_task(asyncio.sleep(7))
+                tree, _ = await parse_tree_stream(response)
             
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
-        
-        captcha_div = soup.select_one("#commonId table tr td div")
-        if not captcha_div:
-            raise ValueError("No captcha div found")
-        form_data = self._extract_form_data(soup)
-        form_data['adblock_detected'] = '0'
-        captcha_code = solve_css_position_captcha(captcha_div)
-        form_data['code'] = str(captcha_code)
+            # One parse for both the hidden inputs and the captcha
+            captcha_divs = _CAPTCHA_XPATH(tree)
+            if not captcha_divs:
+                raise ValueError("No captcha div found")
+            form_data = tree_hidden_inputs(tree)
+            form_data['adblock_detected'] = '0'
+            captcha_code = solve_css_position_captcha(element_to_tag(captcha_divs[0]))
+            form_data['code'] = str(captcha_code)
 
-        # await 7 seconds
-        await asyncio.sleep(7)
+            await countdown
+        finally:
+            if countdown is not None:
+                countdown.cancel()
         
         async with self.session.post(url, data=form_data) as response:
-            html_content = await response.text()
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree, _ = await parse_tree_stream(response)
             
-        anchor = soup.select_one("table a")
-        if not anchor:
+        anchors = _LINK_XPATH(tree)
+        if not anchors:
              raise ValueError("Download link not found")
              
-        direct_url = anchor.get("href")
+        direct_url = anchors[0].get("href")
         if not isinstance(direct_url, str):
              raise ValueError("Invalid download link")
              
         # extract filename from direct_url
-        filename = direct_url.split("/")[-1]
+        filename = filename_from_url(direct_url)
         print(direct_url)
-        filesize = 0
-        async with self.session.head(direct_url, ssl=False) as response:
-            if 'Content-Length' in response.headers:
-                filesize_bytes = int(response.headers['Content-Length'])
-                filesize = filesize_bytes
-            else:
-                raise ValueError("No filesize found")
+        filesize, _ = await probe_content_length(self.session, direct_url, ssl=False)
+        if filesize is None:
+            raise ValueError("No filesize found")
 
         download_info = DownloadInfo(
             filename=filename,
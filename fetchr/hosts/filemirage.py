@@ -1,36 +1,41 @@
 import aiohttp
 import re
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Optional
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
+from ..network import ACCEPT_ENCODING, create_session
+from .common import filename_from_content_disposition, filename_from_url
 from .passtrought import PassThroughResolver
 import asyncio
 import logging
-from bs4 import BeautifulSoup
 
 logger = logging.getLogger("downloader.filemirage")
 
+_DEFAULT_HEADERS = MappingProxyType({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+})
+# window.location.href = "https://filemirage.com/es/file/direct/<uuid>"
+_LOCATION_RE = re.compile(rb'window\.location\.href\s*=\s*"([^"]+)"')
 
+
+@register_resolver
 class FileMirageResolver(AbstractHostResolver):
     host = "filemirage.com"
 
     
     
     def __init__(self):
-        self.session = aiohttp.ClientSession()
-        
-        # set headers
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        }
+        self.session = None
+        self.headers = _DEFAULT_HEADERS
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = create_session()
         return self
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
@@ -46,16 +51,19 @@ class FileMirageResolver(AbstractHostResolver):
         print("📄 Paso 1: Obteniendo página inicial...")
         response = await self.session.get(url)
         response.raise_for_status()
-        html = await response.text()
+        # Only a regex runs over the page: no need to decode it
+        html = await response.read()
         
-        #mathc window.location.href = "https://filemirage.com/es/file/direct/19b26496-26b0-4689-a176-14c451d81489"
-        match = re.search(r'window\.location\.href\s*=\s*"([^"]+)"', html)
+        match = _LOCATION_RE.search(html)
         if match:
-            url = match.group(1)
+            url = match.group(1).decode()
             response = await self.session.get(url, allow_redirects=False)
             redirect_url = response.headers.get("Location")
             response = await self.session.get(redirect_url)
-            filename = response.headers.get("Content-Disposition").split("filename=")[1].split(";")[0].strip('"')
+            filename = (
+                filename_from_content_disposition(response.headers.get("Content-Disposition"))
+                or filename_from_url(redirect_url)
+            )
             size = response.headers.get("Content-Length")
             return DownloadInfo(
                 filename=filename,
@@ -1,11 +1,16 @@
 import aiohttp
+import orjson
+import os
 from dataclasses import dataclass
+from pathlib import Path
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
+from ..network import get_shared_session
+from ..config import CACHE_DIR
 import logging
 import asyncio
-import datetime
-from typing import Optional, Union, List
+import time
+from typing import Iterator, Optional, Union, List
 
 logger = logging.getLogger("downloader.gofile")
 
@@ -43,33 +48,77 @@ class _GoFileTokenManager:
     """Singleton-style token manager for GoFile API.
 
     Caches a token and reuses it until TTL expires. Uses an async lock
-    to avoid concurrent token requests.
+    to avoid concurrent token requests. The token is also kept in
+    cache_path so the next run doesn't have to create a new account.
     """
-    def __init__(self, base_url: str = "https://api.gofile.io", ttl_seconds: int = 3600):
+    def __init__(self, base_url: str = "https://api.gofile.io", ttl_seconds: int = 3600,
+                 cache_path: Optional[Path] = CACHE_DIR / "gofile.token"):
         self.base_url = base_url
         self._token: Optional[str] = None
-        self._obtained_at: Optional[datetime.datetime] = None
+        # time.monotonic() of the last refresh: immune to wall-clock jumps
+        self._obtained_at: Optional[float] = None
         self._ttl = ttl_seconds
         self._lock = asyncio.Lock()
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._cache_path = cache_path
+
+    def _load_cached_token(self) -> Optional[str]:
+        """Token saved by a previous run, if it is still within the TTL."""
+        if self._cache_path is None:
+            return None
+        try:
+            data = orjson.loads(self._cache_path.read_bytes())
+            # Wall-clock time here: monotonic clocks don't survive a restart
+            age = time.time() - data["ts"]
+            token = data["token"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not token or not 0 <= age < self._ttl:
+            return None
+        self._token = token
+        self._obtained_at = time.monotonic() - age
+        return token
+
+    def _save_token(self, token: str):
+        if self._cache_path is None:
+            return
+        # Atomic write; without a writable cache dir the token just isn't kept
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps({"token": token, "ts": time.time()}))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass
+
+    def _cached_token(self) -> Optional[str]:
+        if self._token and self._obtained_at is not None:
+            if time.monotonic() - self._obtained_at < self._ttl:
+                return self._token
+        return None
 
     async def get_token(self, force_new: bool = False) -> str:
+        # Fast path: a valid cached token needs no lock
+        if not force_new:
+            token = self._cached_token()
+            if token:
+                return token
         async with self._lock:
-            if not force_new and self._token and self._obtained_at:
-                age = (datetime.datetime.utcnow() - self._obtained_at).total_seconds()
-                if age < self._ttl:
-                    return self._token
-
-            if not self._session:
-                self._session = aiohttp.ClientSession()
+            # Another caller may have refreshed it while we waited
+            if not force_new:
+                token = self._cached_token() or self._load_cached_token()
+                if token:
+                    return token
 
             try:
-                async with self._session.post(f"{self.base_url}/accounts") as response:
+                # Token requests need no cookies of their own
+                async with get_shared_session().post(f"{self.base_url}/accounts") as response:
                     response.raise_for_status()
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if data.get("status") == "ok":
                         self._token = data["data"]["token"]
-                        self._obtained_at = datetime.datetime.utcnow()
+                        self._obtained_at = time.monotonic()
+                        self._save_token(self._token)
                         return self._token
                     else:
                         raise TokenError(f"Failed to get token: {data.get('status')}")
@@ -79,37 +128,58 @@ class _GoFileTokenManager:
                 raise TokenError(f"Unexpected error while getting token: {e}")
 
     async def close(self):
-        if self._session:
-            await self._session.close()
-            self._session = None
+        # Requests go through the shared session, closed by aclose_shared_session()
+        pass
 
 
 # module-level manager instance (acts as singleton)
 _gofile_token_manager = _GoFileTokenManager()
 
+@register_resolver
 class GofileResolver(AbstractHostResolver):
     host = "gofile.io"
     def __init__(self):
         self.base_url = "https://api.gofile.io"
-        # resolver-specific session (used for content requests)
+        # API requests carry the token in their own headers, no cookies needed
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = get_shared_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The shared session is closed by aclose_shared_session()
+        pass
 
     async def _get_token(self, force_new: bool = False) -> str:
         """Delegate token retrieval to the module-level token manager."""
         return await _gofile_token_manager.get_token(force_new=force_new)
 
-    async def _get_file_info(self, file_id: str) -> FileInfo:
-        """Gets information about a file or folder in GoFile"""
+    @staticmethod
+    def _to_file_info(entry: dict, headers) -> FileInfo:
+        return FileInfo(
+            id=entry["id"],
+            name=entry["name"],
+            type=entry["type"],
+            size=int(entry["size"]),
+            link=entry["link"],
+            headers=headers
+        )
+
+    @classmethod
+    def _iter_folder_files(cls, info: dict, headers) -> Iterator[FileInfo]:
+        """FileInfo of each file in a folder, built only as it is consumed."""
+        for child in info.get("children", {}).values():
+            if child.get("type") == "file":
+                yield cls._to_file_info(child, headers)
+
+    async def _get_file_info(self, file_id: str) -> Union[FileInfo, Iterator[FileInfo]]:
+        """
+        Gets information about a file or folder in GoFile. A folder gives a
+        lazy iterator over its files (sizes come inline, no per-file request).
+        """
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = get_shared_session()
         referer = "https://gofile.io/"
         url = f"{self.base_url}/contents/{file_id}?contentFilter=&page=1&pageSize=1000&sortField=name&sortDirection=1"
         print(f"url: {url}")
@@ -119,35 +189,15 @@ class GofileResolver(AbstractHostResolver):
         print(f"headers: {headers}")
         async with self.session.get(url, headers=headers) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = orjson.loads(await response.read())
             if data.get("status") != "ok":
                 raise aiohttp.ClientResponseError(request_info=response.request_info, history=response.history, status=404, message=f"File not found: {data.get('status')}")
 
             info = data["data"]
             if info.get("type") == "folder":
-                # Take the first file inside the folder
-                files = []
-                for child in info.get("children", {}).values():
-                    if child.get("type") == "file":
-                        file_info = FileInfo(
-                            id=child["id"],
-                            name=child["name"],
-                            type=child["type"],
-                            size=int(child["size"]),
-                            link=child["link"],
-                            headers=response.headers
-                        )
-                        files.append(file_info)
-                return files
+                return self._iter_folder_files(info, response.headers)
             elif info.get("type") == "file":
-                return FileInfo(
-                    id=info["id"],
-                    name=info["name"],
-                    type=info["type"],
-                    size=int(info["size"]),
-                    link=info["link"],
-                    headers=response.headers
-                )
+                return self._to_file_info(info, response.headers)
             else:
                 raise aiohttp.ClientResponseError(request_info=response.request_info, history=response.history, status=404, message=f"Unknown file type: {info.get('type')}")
 
@@ -162,19 +212,12 @@ class GofileResolver(AbstractHostResolver):
         file_id = url.split("/d/")[-1].split("/")[0].split("?")[0]
         file_info = await self._get_file_info(file_id)
         
-        if isinstance(file_info, list):
-            dl_infos = []
-            for file in file_info:
-                dl_info = DownloadInfo(
-                    file.link, 
-                    file.name, 
-                    file.size, 
-                    {
-                        "Cookie": f"accountToken={token}"
-                    }
-                )
-                dl_infos.append(dl_info)
-            return dl_infos
+        if not isinstance(file_info, FileInfo):
+            # Folder: DownloadInfo straight from the iterator, no FileInfo list in between
+            return [
+                DownloadInfo(file.link, file.name, file.size, {"Cookie": f"accountToken={token}"})
+                for file in file_info
+            ]
         
         return DownloadInfo(
             file_info.link, 
@@ -1,54 +1,57 @@
-import aiohttp
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
-import asyncio
-import time
+from ..host_resolver import AbstractHostResolver, register_resolver
 import asyncio
 import logging
-from fetchr.network import get_random_proxy
-from fetchr.config import DEBRID_GATEWAY
+from typing import List
+from fetchr.network import get_random_proxy, get_shared_session
+from fetchr.resolver import info_from_gateway, resolve_link, resolve_links
+from .common import filename_from_content_disposition
 
 
 logger = logging.getLogger("downloader.krakenfiles")
 
-BASE_URL = DEBRID_GATEWAY
+GATEWAY_HEADERS = {"ngrok-skip-browser-warning": "DONE"}
 
+@register_resolver
 class KrakenFilesResolver(AbstractHostResolver):
     host = "krakenfiles.com"
     
     def __init__(self):
-        proxy = get_random_proxy()
-        self.proxy = proxy
-        self.session = aiohttp.ClientSession(proxy=proxy)
+        self.session = None
     
     async def __aenter__(self):
+        # Gateway and HEAD requests need no cookies: use the pooled shared session
+        self.session = get_shared_session()
         return self
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         pass
     async def get_direct_link(self, url: str):
-        endpoint = f"{BASE_URL}/resolve/?url={url}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint, headers={
-                    "ngrok-skip-browser-warning": "DONE"
-                }) as response:
-                response.raise_for_status()
-                data = await response.json()
-                reolved_url = data.get("url")
-                if reolved_url:
-                    print(f"Download url... {reolved_url}")
-                    return reolved_url
-                else:
-                    raise Exception(f"Somethings wrong, {data.get('message')}")
+        data = await resolve_link(url, headers=GATEWAY_HEADERS)
+        return data["url"]
 
     async def get_download_info(self, url: str) -> DownloadInfo:
-        direct_link = await self.get_direct_link(url)
-        async with self.session.head(direct_link) as response:
-            headers_info = dict(response.headers)
+        data = await resolve_link(url, headers=GATEWAY_HEADERS)
+        return await self._download_info(data)
+
+    async def get_download_info_batch(self, urls: List[str]) -> List[DownloadInfo]:
+        # One gateway request for every url, then the HEADs that are still needed concurrently
+        resolved = await resolve_links(urls, headers=GATEWAY_HEADERS)
+        return list(await asyncio.gather(*(self._download_info(data) for data in resolved)))
+
+    async def _download_info(self, data: dict) -> DownloadInfo:
+        direct_link = data["url"]
+        # The gateway may already know name and size: no HEAD round trip then
+        known = info_from_gateway(data)
+        if known:
+            return DownloadInfo(direct_link, known[0], known[1], {})
+
+        filename = "unknown"
+        filesize = 0
+        async with self.session.head(direct_link, proxy=get_random_proxy()) as response:
+            headers_info = response.headers
             if 'Content-Length' in headers_info:
-                filesize_bytes = int(headers_info['Content-Length'])
-                filesize = filesize_bytes
-            if 'Content-Disposition' in headers_info:
-                filename = headers_info['Content-Disposition'].split('filename=')[1].split(';')[0].strip('"')
+                filesize = int(headers_info['Content-Length'])
+            filename = filename_from_content_disposition(headers_info.get('Content-Disposition')) or filename
         download_info = DownloadInfo(direct_link, filename, filesize, {})
         return download_info
         
\ No newline at end of file
@@ -1,11 +1,14 @@
+import asyncio
 import os
-import aiohttp
+import orjson
+from typing import List
 from fetchr.types import DownloadInfo
-from fetchr.host_resolver import AbstractHostResolver
+from fetchr.host_resolver import AbstractHostResolver, register_resolver
 import logging
-from fetchr.network import get_random_proxy
-from fetchr.resolver import get_direct_link
+from fetchr.network import get_random_proxy, get_shared_session
+from fetchr.resolver import get_direct_link, info_from_gateway, resolve_link, resolve_links
 from fetchr.utils import TimeLocker
+from fetchr.hosts.common import filename_from_content_disposition
 from fetchr.config import REALDEBRID_BEARER_TOKEN
 
 logger = logging.getLogger(__name__)
@@ -20,30 +23,33 @@ headers = {
 locker = TimeLocker(60)
 
 
+@register_resolver
 class OneFichierResolver(AbstractHostResolver):
     host = "1fichier.com"
 
     def __init__(self):
-        proxy = get_random_proxy()
-        self.proxy = proxy
-        self.session = aiohttp.ClientSession(headers=headers, proxy=proxy)
+        self.session = None
     
     async def __aenter__(self):
+        # Headers and a random proxy go on each request, so the pooled shared
+        # session fans out over every proxy instead of pinning one
+        self.session = get_shared_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.close()
+        pass
     
     async def _unrestrict_with_realdebrid(self, url: str) -> tuple[str, str, int]:
         api_url = "https://api.real-debrid.com/rest/1.0/unrestrict/link"
         api_headers = {
+            **headers,
             "Authorization": f"Bearer {REALDEBRID_BEARER_TOKEN}",
         }
         data = {"link": url}
         
-        async with self.session.post(api_url, headers=api_headers, data=data) as resp:
+        async with self.session.post(api_url, headers=api_headers, data=data, proxy=get_random_proxy()) as resp:
             resp.raise_for_status()
-            result = await resp.json()
+            result = orjson.loads(await resp.read())
             return result.get("download"), result.get("filename", "unknown"), result.get("filesize", 0)
     
     async def get_direct_link(self, url: str):
@@ -65,15 +71,32 @@ class OneFichierResolver(AbstractHostResolver):
             except Exception as e:
                 logger.warning(f"Real-Debrid failed: {e}, falling back to standard resolver")
         
-        direct_link = await self.get_direct_link(url)
+        # Real-Debrid already failed above: go straight to the gateway
+        await locker.wait()
+        data = await resolve_link(url)
+        return await self._download_info(data)
+
+    async def get_download_info_batch(self, urls: List[str]) -> List[DownloadInfo]:
+        if REALDEBRID_BEARER_TOKEN:
+            return await super().get_download_info_batch(urls)
+        # A single gateway request, so a single wait on the rate limiter
+        await locker.wait()
+        resolved = await resolve_links(urls)
+        return list(await asyncio.gather(*(self._download_info(data) for data in resolved)))
+
+    async def _download_info(self, data: dict) -> DownloadInfo:
+        direct_link = data["url"]
+        known = info_from_gateway(data)
+        if known:
+            return DownloadInfo(direct_link, known[0], known[1], {})
+
         filename = "unknown"
         filesize = 0
         
-        async with self.session.head(direct_link) as response:
-            headers_info = dict(response.headers)
+        async with self.session.head(direct_link, headers=headers, proxy=get_random_proxy()) as response:
+            headers_info = response.headers
             if 'Content-Length' in headers_info:
                 filesize = int(headers_info['Content-Length'])
-            if 'Content-Disposition' in headers_info:
-                filename = headers_info['Content-Disposition'].split('filename=')[1].split(';')[0].strip('"')
+            filename = filename_from_content_disposition(headers_info.get('Content-Disposition')) or filename
         
         return DownloadInfo(direct_link, filename, filesize, {})
@@ -2,9 +2,10 @@ from ..types import DownloadInfo
 from ..host_resolver import AbstractHostResolver
 import aiohttp
 import os
-from fetchr.network import get_tor_client, get_aiohttp_proxy_connector, get_random_proxy
+from fetchr.network import ACCEPT_ENCODING, get_tor_client, get_aiohttp_proxy_connector, get_random_proxy
 import logging
-from urllib.parse import unquote
+from multidict import CIMultiDict
+from .common import filename_from_content_disposition, probe_content_length
 logger = logging.getLogger("downloader.passtrought")
 
 def _env_proxy_hint():
@@ -29,7 +30,7 @@ class PassThroughResolver(AbstractHostResolver):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
@@ -67,29 +68,55 @@ class PassThroughResolver(AbstractHostResolver):
             logger.error("PassThroughResolver: client is None (session not ready?)")
             raise RuntimeError("PassThroughResolver: no HTTP client available")
 
+        # Only headers are needed: HEAD follows the redirects without moving the body
+        kwargs.setdefault("allow_redirects", True)
         while True:
-            logger.debug("PassThroughResolver: GET %s", url)
-            response = await client.get(url, *args, **kwargs)
+            logger.debug("PassThroughResolver: HEAD %s", url)
+            response = await client.head(url, *args, **kwargs)
+            response.release()
             logger.debug(
                 "PassThroughResolver: response status=%s url=%s",
                 response.status,
                 response.url,
             )
-            if response.status == 405:
-                logger.warning("PassThroughResolver: 405 Method Not Allowed, retrying GET for %s", url)
-                response = await client.get(url, *args, **kwargs)
-                logger.debug("PassThroughResolver: retry response status=%s", response.status)
+            if response.status >= 400:
+                # 405, but also e.g. 403 from presigned URLs whose signature covers the method
+                logger.warning("PassThroughResolver: HEAD refused (%s), retrying ranged GET for %s", response.status, url)
+                # HEAD already followed the redirects; probe the final URL with a one-byte GET
+                url = str(response.url)
+                probe_kwargs = {k: v for k, v in kwargs.items() if k != "allow_redirects"}
+                try:
+                    size, headers_info = await probe_content_length(
+                        client, url, head_fallback=False, **probe_kwargs
+                    )
+                except aiohttp.ClientResponseError as e:
+                    logger.warning(
+                        "PassThroughResolver: ranged GET failed status=%s for url=%s",
+                        e.status,
+                        url,
+                    )
+                    raise Exception(f"Failed to get download info, status code: {e.status}") from e
+                content_disp = CIMultiDict(headers_info).get("Content-Disposition")
+                # Unknown total (e.g. "bytes 0-0/*"): same as a missing Content-Length
+                size = size or 0
+                logger.info(
+                    "PassThroughResolver: ranged GET final_url=%s Content-Length=%s Content-Disposition=%s",
+                    url,
+                    size,
+                    content_disp or "(none)",
+                )
+                break
             if response.status == 200:
                 final_url = str(response.url)
                 if final_url != url:
                     logger.info("PassThroughResolver: redirect %s -> %s", url, final_url)
                 url = final_url
                 content_disp = response.headers.get("Content-Disposition")
-                content_length = response.headers.get("Content-Length", "0")
+                size = int(response.headers.get("Content-Length", "0"))
                 logger.info(
-                    "PassThroughResolver: 200 OK final_url=%s Content-Length=%s Content-Disposition=%s",
+                    "PassThroughResolver: OK final_url=%s Content-Length=%s Content-Disposition=%s",
                     url,
-                    content_length,
+                    size,
                     content_disp or "(none)",
                 )
                 break
@@ -101,45 +128,14 @@ class PassThroughResolver(AbstractHostResolver):
             )
             raise Exception(f"Failed to get download info, status code: {response.status}")
 
-        filename = None
-        if content_disp:
-            cdl = content_disp.lower()
-            # Prefer RFC 5987 filename* parameter, e.g. filename*=UTF-8''prasped.7z.004
-            if "filename*=" in cdl:
-                try:
-                    # Extract the raw value after filename*=
-                    raw_part = content_disp.split("filename*=", 1)[1].split(";", 1)[0].strip()
-                    # Remove surrounding quotes if present
-                    if raw_part.startswith('"') and raw_part.endswith('"'):
-                        raw_part = raw_part[1:-1]
-                    # Format: charset''urlencoded-filename
-                    # Example: UTF-8''prasped.7z.004
-                    if "''" in raw_part:
-                        _, encoded_name = raw_part.split("''", 1)
-                    else:
-                        encoded_name = raw_part
-                    filename = unquote(encoded_name)
-                    logger.debug("PassThroughResolver: filename from filename*= %s", filename)
-                except Exception as e:
-                    logger.warning("PassThroughResolver: failed to parse filename* from Content-Disposition: %s", e)
-                    filename = None
-            # Fallback to simple filename=
-            if not filename and "filename=" in cdl:
-                try:
-                    raw_part = content_disp.split("filename=", 1)[1].split(";", 1)[0].strip()
-                    if raw_part.startswith('"') and raw_part.endswith('"'):
-                        raw_part = raw_part[1:-1]
-                    filename = raw_part
-                    logger.debug("PassThroughResolver: filename from filename= %s", filename)
-                except Exception as e:
-                    logger.warning("PassThroughResolver: failed to parse filename from Content-Disposition: %s", e)
-                    filename = None
+        filename = filename_from_content_disposition(content_disp)
+        if filename:
+            logger.debug("PassThroughResolver: filename from Content-Disposition: %s", filename)
 
         if not filename:
             filename = url.rstrip("/").split("/")[-1]
             logger.debug("PassThroughResolver: filename from URL path: %s", filename)
 
-        size = int(response.headers.get("Content-Length", "0"))
         logger.info(
             "PassThroughResolver: returning DownloadInfo url=%s filename=%s size=%s",
             url,
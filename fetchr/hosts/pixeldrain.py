@@ -1,15 +1,18 @@
 import logging
 import aiohttp
 from fetchr.types import DownloadInfo
-from fetchr.host_resolver import AbstractHostResolver
+from fetchr.host_resolver import AbstractHostResolver, register_resolver
 from fetchr.resolver import get_direct_link
 from fetchr.network.proxy import get_aiohttp_proxy_connector
+from fetchr.hosts.common import filename_from_content_disposition
 logger = logging.getLogger("fetchr.hosts.pixeldrain")
 
+@register_resolver
 class PixelDrainResolver(AbstractHostResolver):
     host = "pixeldrain.com"
     def __init__(self, timeout: int = 5):
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -30,17 +33,16 @@ class PixelDrainResolver(AbstractHostResolver):
         direct_link = url.replace("/u/", "/api/file/")
         async with self.session.head(direct_link, timeout=aiohttp.ClientTimeout(total=10)) as response:
             response.raise_for_status()
-            headers_info = dict(response.headers)
+            headers_info = response.headers
             if 'Content-Length' not in headers_info:
                 raise Exception(f"Missing Content-Length header for {url}")
             filesize = int(headers_info['Content-Length'])
             
             if 'Content-Disposition' not in headers_info:
                 raise Exception(f"Missing Content-Disposition header for {url}")
-            try:
-                filename = headers_info['Content-Disposition'].split('filename=')[1].split(';')[0].strip('"')
-            except (IndexError, KeyError) as e:
-                raise Exception(f"Failed to parse filename from Content-Disposition for {url}") from e
+            filename = filename_from_content_disposition(headers_info['Content-Disposition'])
+            if not filename:
+                raise Exception(f"Failed to parse filename from Content-Disposition for {url}")
         
         download_info = DownloadInfo(
             filename=filename,
@@ -1,9 +1,10 @@
 import aiohttp
+import orjson
 import re
 from dataclasses import dataclass
 from typing import Optional
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 import asyncio
 from fetchr.network import get_aiohttp_proxy_connector
 class RanozError(Exception):
@@ -35,6 +36,7 @@ class FileInfo:
     url: str
     upload_state: str
 
+@register_resolver
 class RanozResolver(AbstractHostResolver):
     host = "ranoz.gg"
     def __init__(self):
@@ -59,10 +61,8 @@ class RanozResolver(AbstractHostResolver):
                 timeout=10
             ) as response:
                 response.raise_for_status()
-                import json
-                # data can be text or json
-                data = await response.text()
-                data = json.loads(data)
+                # data can be text or json: parse the body whatever its Content-Type
+                data = orjson.loads(await response.read())
                 print(data)
                 if 'data' not in data:
                     raise FileNotFoundError(f"File not found: {file_id}")
@@ -1,8 +1,9 @@
 import asyncio
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 import cloudscraper
 
+@register_resolver
 class SendNowResolver(AbstractHostResolver):
     host = "send.now"
     def __init__(self, timeout: int = 5):
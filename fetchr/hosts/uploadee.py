@@ -1,17 +1,18 @@
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 from ..types import DownloadInfo
 import logging
-from bs4 import BeautifulSoup
-from fetchr.network import get_random_proxy
+from .common import parse_html
+from fetchr.network import create_session, get_random_proxy
 import aiohttp
 
 logger = logging.getLogger("downloader.uploadee")
 
 
+@register_resolver
 class UploadeeResolver(AbstractHostResolver):
     async def __aenter__(self):
         self.proxy = get_random_proxy()
-        self.session = aiohttp.ClientSession(proxy=self.proxy)
+        self.session = create_session(proxy=self.proxy)
         logger.debug(f"UploadeeResolver: session created (proxy={self.proxy})")
         return self
     
@@ -31,7 +32,7 @@ class UploadeeResolver(AbstractHostResolver):
             logger.error(f"Failed to fetch page: {e}")
             raise Exception(f"Failed to fetch page for {url}: {e}")
         
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
         if "There is no such file." in html:
             logger.error("File not found on server")
             raise FileNotFoundError("File not found")
@@ -3,14 +3,15 @@ import re
 from dataclasses import dataclass
 from typing import Optional
 from ..types import DownloadInfo
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 from .passtrought import PassThroughResolver
 import asyncio
 import logging
-from bs4 import BeautifulSoup
+from .common import parse_html
 import aiohttp
 logger = logging.getLogger("downloader.uploadflix")
 
+@register_resolver
 class UploadFlixResolver(AbstractHostResolver):
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -39,7 +40,7 @@ class UploadFlixResolver(AbstractHostResolver):
             
             # document.querySelector(".dfile").firstChild.textContent.trim()
             
-            soup = BeautifulSoup(html, "html.parser")
+            soup = parse_html(html)
             
             # if "404 NOT FOUND" in html, raise ValueError
 
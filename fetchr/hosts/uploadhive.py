@@ -1,19 +1,19 @@
-import aiohttp
-from ..host_resolver import AbstractHostResolver
+from ..host_resolver import AbstractHostResolver, register_resolver
 from ..types import DownloadInfo
-from bs4 import BeautifulSoup
-from fetchr.network import get_random_proxy
+from .common import parse_html
+from fetchr.network import create_session, get_random_proxy
 
+@register_resolver
 class UploadHiveResolver(AbstractHostResolver):
     async def __aenter__(self):
         self.proxy = get_random_proxy()
-        self.session = aiohttp.ClientSession(
+        self.session = create_session(
             proxy=self.proxy
         )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
+        await self.session.close()
     
     def _get_id(self, url: str) -> str:
         return url.split("/")[-1]
@@ -64,7 +64,7 @@ class UploadHiveResolver(AbstractHostResolver):
         if any(message in html for message in NOT_FOUND_MESSAGES):
             raise FileNotFoundError("File not found")
         
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
         
         anchor = soup.select_one("#direct_link a")
         direct_url = anchor.get("href")
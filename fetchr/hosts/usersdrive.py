@@ -1,52 +1,59 @@
-import aiohttp
 from fetchr.types import DownloadInfo
-from fetchr.host_resolver import AbstractHostResolver
+from fetchr.host_resolver import AbstractHostResolver, register_resolver
+import asyncio
 import logging
-from fetchr.network import get_random_proxy
-from fetchr.config import DEBRID_GATEWAY
+from typing import List
+from fetchr.network import get_random_proxy, get_shared_session
+from fetchr.resolver import info_from_gateway, resolve_link, resolve_links
+from fetchr.hosts.common import filename_from_content_disposition
 
 logger = logging.getLogger(__name__)
 
 
+@register_resolver
 class UsersDriveResolver(AbstractHostResolver):
     
     def __init__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = None
     
     async def __aenter__(self):
+        # Sesión compartida (pool de conexiones); no hacen falta cookies propias
+        self.session = get_shared_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.close()
+        pass
     
     async def get_direct_link(self, url: str) -> str:
         """Obtiene el enlace directo llamando al resolver gateway."""
-        endpoint = f"{DEBRID_GATEWAY}/resolve/?url={url}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint) as response:
-                response.raise_for_status()
-                data = await response.json()
-                resolved_url = data.get("url")
-                if resolved_url:
-                    logger.debug(f"UsersDrive resolved: {resolved_url}")
-                    return resolved_url
-                else:
-                    raise Exception(f"Resolution failed: {data.get('message')}")
+        data = await resolve_link(url)
+        return data["url"]
 
     async def get_download_info(self, url: str) -> DownloadInfo:
         """Obtiene información de descarga incluyendo el enlace directo."""
-        direct_link = await self.get_direct_link(url)
+        data = await resolve_link(url)
+        return await self._download_info(data)
+
+    async def get_download_info_batch(self, urls: List[str]) -> List[DownloadInfo]:
+        """Resuelve todos los enlaces con una sola petición al gateway."""
+        resolved = await resolve_links(urls)
+        return list(await asyncio.gather(*(self._download_info(data) for data in resolved)))
+
+    async def _download_info(self, data: dict) -> DownloadInfo:
+        direct_link = data["url"]
+        # El gateway puede devolver nombre y tamaño: sin HEAD en ese caso
+        known = info_from_gateway(data)
+        if known:
+            return DownloadInfo(direct_link, known[0], known[1], {})
+
         filename = "unknown"
         filesize = 0
         
         async with self.session.head(direct_link) as response:
-            headers_info = dict(response.headers)
+            headers_info = response.headers
             if 'Content-Length' in headers_info:
                 filesize = int(headers_info['Content-Length'])
-            if 'Content-Disposition' in headers_info:
-                disp = headers_info['Content-Disposition']
-                if 'filename=' in disp:
-                    filename = disp.split('filename=')[1].split(';')[0].strip('"')
+            filename = filename_from_content_disposition(headers_info.get('Content-Disposition')) or filename
         
         if filename == "unknown":
             # Intentar extraer del URL
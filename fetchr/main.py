@@ -55,7 +55,7 @@ class Downloader():
             host = host[4:]
         return host
         
-    async def  download_file(self, url: str, download_dir, callback_progress: Callable[[int, int], None] = lambda a, b: None, solve_captcha: Callable[[str], Awaitable[None]] = None) -> str:
+    async def  download_file(self, url: str, download_dir, callback_progress: Callable[[int, int], None] = lambda a, b: None, solve_captcha: Callable[[str], Awaitable[None]] = None, session: Optional[aiohttp.ClientSession] = None) -> str:
         try:
             if "st1.ranoz.gg" in url:
                 # replace to st7
@@ -108,7 +108,7 @@ class Downloader():
                 logger.debug(f"download info its a list {len(download_info)}")
                 tasks = []
                 for dl_info in download_info:
-                    options = self._get_options(HOST_MANAGER, download_dir, dl_info, resolver, callback_progress)
+                    options = self._get_options(HOST_MANAGER, download_dir, dl_info, resolver, callback_progress, session)
                     task = asyncio.create_task(self.process_download(options, host, download_dir, dl_info))
                     tasks.append(task)
                 results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -118,7 +118,7 @@ class Downloader():
                         logger.error(f"Download {i+1}/{len(download_info)} failed: {result}")
                         raise result
             else:
-                options = self._get_options(HOST_MANAGER, download_dir, download_info, resolver, callback_progress)
+                options = self._get_options(HOST_MANAGER, download_dir, download_info, resolver, callback_progress, session)
                 logger.debug("download info its not a list")
                 await self.process_download(options, host, download_dir, download_info)
         except Exception as e:
@@ -180,7 +180,7 @@ class Downloader():
         return False
     
     
-    def _get_options(self, HOST_MANAGER, download_dir, download_info, resolver, callback_progress):
+    def _get_options(self, HOST_MANAGER, download_dir, download_info, resolver, callback_progress, session=None):
          return {
             "max_connections": HOST_MANAGER.get("max_connections", 5),
             "download_with_aria2c": HOST_MANAGER.get("download_with_aria2c", False),
@@ -192,6 +192,7 @@ class Downloader():
             "aria2c_parallel": HOST_MANAGER.get("aria2c_parallel", False),
             "resolver": resolver,
             "use_headers": HOST_MANAGER.get("use_headers", False),
+            "session": session,
         }   
                 
     async def start_download(self, options):
@@ -216,7 +217,7 @@ class Downloader():
                 callback_progress=options["callback_progress"], 
                 ignore_ssl=options["ignore_ssl"],
                 chunk_size=self.chunk_size,
-                session=options["resolver"].session if hasattr(options["resolver"], "session") else None,
+                session=options["session"],
                 parallel_connections=options["max_connections"],
                 use_random_proxy=options["use_random_proxy"],
                 download_with_aria2c=options["aria2c_parallel"],
@@ -239,14 +240,19 @@ class Downloader():
         download_with_aria2c: bool = False
     ) -> Optional[str]:
         print(f"Downloading url: {download_info.download_url}")
+        # A session passed in is shared (e.g. by ConcurrencyManager) and is not closed here
+        owns_session = False
+        response = None
         try:
             if isinstance(downloads_dir, str):
                 downloads_dir = Path(downloads_dir)
             if use_random_proxy:
                 from fetchr.network import get_aiohttp_proxy_connector
                 session = get_aiohttp_proxy_connector()
-            else:
+                owns_session = True
+            elif session is None:
                 session = aiohttp.ClientSession()
+                owns_session = True
                 
             response = None
             file_handle = None
@@ -304,12 +310,6 @@ class Downloader():
                             await callback_progress(downloaded, download_info.size)
                             last_callback = now
 
-                if file_handle:
-                    print(f"Closing file handle", file_handle)
-                    await file_handle.close()
-                if session:
-                    print(f"Closing session", session)
-                    await session.close()
                             
                 if download_info.size and downloaded < download_info.size:
                     raise Exception("Incomplete download")
@@ -343,10 +343,15 @@ class Downloader():
             logger.error(f"Error downloading {download_info.filename if download_info else 'unknown'}: {error_type}: {error_msg}")
             logger.debug(f"Full exception traceback:", exc_info=True)
             raise
+        finally:
+            if response is not None:
+                response.release()
+            if owns_session:
+                await session.close()
+
     def _extract_filename(self, response: aiohttp.ClientResponse, url: str) -> str:
         """Get filename from headers or fallback."""
-        cd = response.headers.get("content-disposition")
-        if cd and "filename=" in cd:
-            return cd.split("filename=")[1].strip('" ')
-        return os.path.basename(url) 
+        from fetchr.hosts.common import filename_from_content_disposition
+        filename = filename_from_content_disposition(response.headers.get("content-disposition"))
+        return filename or os.path.basename(url) 
 
@@ -4,12 +4,13 @@ from pathlib import Path
 from typing import List, Optional
 from urllib.parse import urlparse
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from fetchr.database.session import init_db, SessionLocal
 from fetchr.database.models import Package, File
 from fetchr.aria2_daemon import Aria2DaemonManager
 from fetchr.config_loader import load_hosts_config
+from fetchr.network import aclose_shared_session
 from fetchr.types import DownloadInfo
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,8 @@ class DownloadManager:
                 await self._sync_task
             except asyncio.CancelledError:
                 pass
+        await self.aria2.shutdown()
+        await aclose_shared_session()
 
     def _get_host(self, url: str) -> str:
         """Extract host from URL."""
@@ -214,7 +217,8 @@ class DownloadManager:
         Package.status = "GRABBER", File.status = "QUEUED" (ok) or "ERROR" (failed).
         """
         session = SessionLocal()
-        created_files = []
+        # Column values per file; inserted together in one INSERT ... RETURNING
+        rows = []
         try:
             package = session.get(Package, package_id)
             if not package:
@@ -233,35 +237,35 @@ class DownloadManager:
                     infos = result if isinstance(result, list) else [result]
 
                     for info in infos:
-                        file_record = File(
-                            package_id=package.id,
-                            url=url,
-                            filename=info.filename,
-                            status="QUEUED",
-                            size_bytes=info.size or None
-                        )
-                        session.add(file_record)
-                        created_files.append(file_record)
+                        rows.append({
+                            "package_id": package.id,
+                            "url": url,
+                            "filename": info.filename,
+                            "status": "QUEUED",
+                            "size_bytes": info.size or 0,
+                            "error_message": None,
+                        })
                         logger.info(f"Analyzed {info.filename} ({info.size or 'unknown'} bytes)")
                         
                 except Exception as e:
                     # Resolution failed - create ERROR file with message
                     error_msg = str(e)
-                    file_record = File(
-                        package_id=package.id,
-                        url=url,
-                        filename=f"UNKNOUN",
-                        status="ERROR",
-                        size_bytes=None,
-                        error_message=error_msg
-                    )
-                    session.add(file_record)
-                    created_files.append(file_record)
+                    rows.append({
+                        "package_id": package.id,
+                        "url": url,
+                        "filename": f"UNKNOUN",
+                        "status": "ERROR",
+                        "size_bytes": 0,
+                        "error_message": error_msg,
+                    })
                     logger.error(f"✗ Failed to analyze {url}: {error_msg}")
             
+            created_files = []
+            if rows:
+                created_files = session.scalars(insert(File).returning(File), rows).all()
+                # ids follow insertion order; RETURNING row order is not guaranteed
+                created_files = sorted(created_files, key=lambda f: f.id)
             session.commit()
-            for f in created_files:
-                session.refresh(f)
                 
             return created_files
         finally:
@@ -399,6 +403,11 @@ class DownloadManager:
                 select(File).where(File.status.in_(["DOWNLOADING", "QUEUED", "PAUSED"]))
             ).scalars().all()
 
+            # One multicall for every tracked download instead of a tellStatus each
+            statuses = self.aria2.get_statuses(
+                [f.aria2_gid for f in active_files if f.aria2_gid]
+            )
+
             for file_record in active_files:
                 gid = file_record.aria2_gid
                 filename = file_record.filename
@@ -406,7 +415,7 @@ class DownloadManager:
                 if not gid:
                     continue
 
-                aria_status = self.aria2.get_status(gid)
+                aria_status = statuses.get(gid)
                 if not aria_status:
                     if file_record.status == "DOWNLOADING":
                         logger.warning(f"GID {gid} not found in Aria2. Marking as ERROR.")
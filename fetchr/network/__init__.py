@@ -3,10 +3,16 @@ fetchr network utilities
 """
 from .proxy import get_proxies, get_random_proxy, get_aiohttp_proxy_connector
 from .tor import get_tor_client
+from .session import ACCEPT_ENCODING, get_shared_connector, create_session, get_shared_session, aclose_shared_session
 
 __all__ = [
+    "ACCEPT_ENCODING",
     "get_proxies",
     "get_random_proxy", 
     "get_aiohttp_proxy_connector",
-    "get_tor_client"
+    "get_tor_client",
+    "get_shared_connector",
+    "create_session",
+    "get_shared_session",
+    "aclose_shared_session",
 ]
@@ -4,14 +4,29 @@ Proxy utilities for fetchr
 import os
 import random
 import time
-import aiohttp
 from fetchr.config import PROXIES_PATH
+from .session import create_session
+
+
+# (mtime_ns, size) of the proxies file and its parsed list; None key = no file
+_proxies_cache = (False, [])
 
 
 def get_proxies():
     """Get list of proxies from file. Returns empty list if file doesn't exist."""
-    if not PROXIES_PATH.exists():
+    global _proxies_cache
+    # Re-read only when the file changes: resolvers pick a proxy per request
+    try:
+        st = PROXIES_PATH.stat()
+        key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    if key == _proxies_cache[0]:
+        return list(_proxies_cache[1])
+
+    if key is None:
         print(f"No proxies file found at {PROXIES_PATH}")
+        _proxies_cache = (None, [])
         return []
     
     with open(PROXIES_PATH, "r", encoding='utf-8') as f:
@@ -22,8 +37,9 @@ def get_proxies():
         proxy = proxy.strip()
         if proxy:
             fix_proxies.append("http://" + proxy)
-        
-    return fix_proxies
+    
+    _proxies_cache = (key, fix_proxies)
+    return list(fix_proxies)
 
 
 def get_random_proxy():
@@ -36,18 +52,16 @@ def get_random_proxy():
     return random.choice(proxies)
 
 
-def get_aiohttp_proxy_connector():
-    """Get aiohttp session with optional proxy. Returns session without proxy if none available."""
+def get_aiohttp_proxy_connector(**kwargs):
+    """
+    Get aiohttp session with optional proxy. Returns session without proxy if none available.
+    Extra kwargs (e.g. default headers) are passed to the ClientSession.
+    """
     proxy_url = get_random_proxy()
-    connector = aiohttp.TCPConnector()
     
+    # Pooled connections come from the shared connector
     if proxy_url:
-        session = aiohttp.ClientSession(
-            connector=connector,
-            proxy=proxy_url
-        )
+        session = create_session(proxy=proxy_url, **kwargs)
     else:
-        session = aiohttp.ClientSession(
-            connector=connector
-        )
+        session = create_session(**kwargs)
     return session
@@ -0,0 +1,81 @@
+"""
+Shared aiohttp connection pool for fetchr
+"""
+import asyncio
+import importlib.util
+from typing import Optional
+import aiohttp
+
+# One connector per process (re-created if used from a different event loop).
+# Sessions built on it keep their own cookies/headers but reuse its TCP/TLS
+# connections, so resolving many links on a host doesn't redo the handshake.
+_connector: Optional[aiohttp.TCPConnector] = None
+_connector_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+# Cap on open sockets across every session on the shared connector. Not
+# capped per host: ConcurrencyManager already limits downloads per host and
+# parallel downloads open several connections to one host through this pool.
+SHARED_CONNECTOR_LIMIT = 100
+
+# aiohttp only decodes brotli when a brotli module is installed
+# (pip install fetchr[speedups]); don't advertise br otherwise
+ACCEPT_ENCODING = (
+    "br, gzip, deflate"
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi")
+    else "gzip, deflate"
+)
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """Get the process-wide connector for the running event loop."""
+    global _connector, _connector_loop, _shared_session
+    loop = asyncio.get_running_loop()
+    if _connector is None or _connector.closed or _connector_loop is not loop:
+        _connector = aiohttp.TCPConnector(
+            limit=SHARED_CONNECTOR_LIMIT, ttl_dns_cache=300, keepalive_timeout=75
+        )
+        _connector_loop = loop
+        _shared_session = None
+    return _connector
+
+
+def create_session(**kwargs) -> aiohttp.ClientSession:
+    """
+    Create a session on the shared connector. Closing it leaves the
+    connector (and its pooled connections) open.
+    """
+    return aiohttp.ClientSession(
+        connector=get_shared_connector(),
+        connector_owner=False,
+        **kwargs
+    )
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Get a long-lived session for requests that don't need their own cookies.
+    It is used by many resolvers at once, so it keeps no cookies at all;
+    pass headers and proxy per request.
+    """
+    global _shared_session
+    connector = get_shared_connector()
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=False,
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+    return _shared_session
+
+
+async def aclose_shared_session():
+    """Close the shared session and connector (application shutdown)."""
+    global _connector, _connector_loop, _shared_session
+    session, _shared_session = _shared_session, None
+    connector, _connector = _connector, None
+    _connector_loop = None
+    if session is not None and not session.closed:
+        await session.close()
+    if connector is not None and not connector.closed:
+        await connector.close()
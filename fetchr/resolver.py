@@ -1,18 +1,53 @@
+import asyncio
+import orjson
 from fetchr.config import DEBRID_GATEWAY
-import aiohttp
+from fetchr.network import get_shared_session
 import logging
 logger = logging.getLogger(__name__)
 
-async def get_direct_link(url: str):
+async def resolve_link(url: str, headers=None) -> dict:
+    """
+    Ask the debrid gateway to resolve url. The answer always has "url";
+    gateways that know the file also send "filename" and "filesize".
+    """
     endpoint = f"{DEBRID_GATEWAY}/resolve/?url={url}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(endpoint) as response:
+    async with get_shared_session().get(endpoint, headers=headers) as response:
+        response.raise_for_status()
+        data = orjson.loads(await response.read())
+        reolved_url = data.get("url")
+        if reolved_url:
+            logger.debug(f"Download url... {reolved_url}")
+            return data
+        else:
+            logger.error(f"Somethings wrong, {data.get('message')}")
+            raise Exception(f"Somethings wrong, {data.get('message')}")
+
+async def resolve_links(urls, headers=None) -> list:
+    """
+    Resolve several urls with one POST to the gateway's /resolve_batch/
+    (a JSON array in, a list of resolve_link() answers out). Gateways
+    without that endpoint get one concurrent /resolve/ per url.
+    """
+    endpoint = f"{DEBRID_GATEWAY}/resolve_batch/"
+    async with get_shared_session().post(endpoint, json=list(urls), headers=headers) as response:
+        if response.status not in (404, 405, 501):
             response.raise_for_status()
-            data = await response.json()
-            reolved_url = data.get("url")
-            if reolved_url:
-                logger.debug(f"Download url... {reolved_url}")
-                return reolved_url
-            else:
-                logger.error(f"Somethings wrong, {data.get('message')}")
-                raise Exception(f"Somethings wrong, {data.get('message')}")
\ No newline at end of file
+            results = orjson.loads(await response.read())
+            for data in results:
+                if not data.get("url"):
+                    raise Exception(f"Somethings wrong, {data.get('message')}")
+            return results
+    logger.debug("Gateway has no /resolve_batch/, resolving one by one")
+    return list(await asyncio.gather(*(resolve_link(url, headers=headers) for url in urls)))
+
+async def get_direct_link(url: str):
+    data = await resolve_link(url)
+    return data["url"]
+
+def info_from_gateway(data: dict):
+    """(filename, filesize) from a gateway answer, or None if it didn't send both."""
+    filename = data.get("filename")
+    filesize = data.get("filesize")
+    if filename and filesize:
+        return filename, int(filesize)
+    return None
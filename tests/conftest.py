@@ -1,8 +1,13 @@
 """
 Pytest configuration and fixtures for fetchr tests.
 """
+import os
+from contextlib import contextmanager
 import pytest
 
+# Turn accidental lazy loads into errors (see fetchr.database.session.strict_loading)
+os.environ.setdefault("FETCHR_STRICT_DB", "1")
+
 
 @pytest.fixture
 def sample_urls():
@@ -12,3 +17,24 @@ def sample_urls():
         "gofile": "https://gofile.io/d/abc123",
         "1fichier": "https://1fichier.com/?abc123",
     }
+
+
+@pytest.fixture
+def assert_queries():
+    """
+    Fail if a block runs more SQL statements than allowed:
+
+        with assert_queries(2, engine):
+            ...
+    """
+    from fetchr.database._profile import count_queries
+
+    @contextmanager
+    def _assert_queries(max_n, engine=None):
+        with count_queries(engine) as statements:
+            yield statements
+        assert len(statements) <= max_n, (
+            f"expected at most {max_n} queries, got {len(statements)}:\n" + "\n".join(statements)
+        )
+
+    return _assert_queries
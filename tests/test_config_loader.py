@@ -0,0 +1,37 @@
+"""
+Tests for fetchr config loader.
+"""
+import os
+import pytest
+from fetchr import config_loader
+
+
+class TestYamlCache:
+    """Tests for the on-disk cache of the parsed hosts YAML."""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setattr(config_loader, "CACHE_DIR", cache_dir)
+        return cache_dir
+
+    def test_cache_written_and_reused(self, tmp_path, cache_dir):
+        """Second load is served from the pickle."""
+        config_path = tmp_path / "hosts.yaml"
+        config_path.write_text("supported_hosts:\n  - a.com\n")
+
+        assert config_loader._load_yaml_cached(config_path) == {"supported_hosts": ["a.com"]}
+        assert len(list(cache_dir.glob("hosts.yaml.*.pkl"))) == 1
+        assert config_loader._load_yaml_cached(config_path) == {"supported_hosts": ["a.com"]}
+
+    def test_cache_invalidated_on_change(self, tmp_path, cache_dir):
+        """Editing the YAML invalidates the cache."""
+        config_path = tmp_path / "hosts.yaml"
+        config_path.write_text("supported_hosts:\n  - a.com\n")
+        config_loader._load_yaml_cached(config_path)
+
+        config_path.write_text("supported_hosts:\n  - b.com\n")
+        st = config_path.stat()
+        os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert config_loader._load_yaml_cached(config_path) == {"supported_hosts": ["b.com"]}
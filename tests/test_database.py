@@ -0,0 +1,57 @@
+"""
+Tests for fetchr database helpers.
+"""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker, selectinload
+
+from fetchr.database import session as db_session
+from fetchr.database.models import Base, Package, File
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(db_session, "SessionLocal", factory)
+    with factory() as session:
+        root = Package(name="root", path="/tmp/root")
+        child = Package(name="child", path="/tmp/root/child", parent=root)
+        child.files.append(File(url="https://example.com/a", filename="a"))
+        session.add(root)
+        session.commit()
+    return engine
+
+
+class TestStrictLoading:
+    """Tests for the strict_loading() session."""
+
+    def test_unloaded_relationship_raises(self, memory_db):
+        """Relationships not requested up front raise."""
+        with db_session.strict_loading() as session:
+            root = session.execute(select(Package).where(Package.parent_id.is_(None))).scalar_one()
+            with pytest.raises(InvalidRequestError):
+                root.children
+
+    def test_requested_relationships_load(self, memory_db, assert_queries):
+        """Options passed to strict_loading() are applied to the query."""
+        with db_session.strict_loading(selectinload(Package.children).selectinload(Package.files)) as session:
+            # root, its children, then their files
+            with assert_queries(3, memory_db):
+                root = session.execute(select(Package).where(Package.parent_id.is_(None))).scalar_one()
+                assert [f.filename for f in root.children[0].files] == ["a"]
+
+
+class TestFileProgress:
+    """Tests for the File.progress hybrid."""
+
+    def test_progress_in_python_and_sql(self, memory_db):
+        with db_session.strict_loading() as session:
+            f = session.execute(select(File)).scalar_one()
+            f.size_bytes, f.downloaded_bytes = 200, 50
+            session.commit()
+            assert f.progress == 25.0
+            assert session.execute(select(File.id).where(File.progress > 20)).scalar_one() == f.id
+            assert session.execute(select(File.id).where(File.progress > 30)).first() is None
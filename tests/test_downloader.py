@@ -108,3 +108,21 @@ class TestDownloaderCheckExists:
         
         result = downloader.check_exists(tmp_path, info)
         assert result is False
+
+
+class TestAria2PidProbe:
+    """Tests for the aria2c daemon liveness check."""
+
+    def test_windows_never_signals(self, monkeypatch):
+        """On Windows os.kill(pid, 0) terminates the process, so it must not be used."""
+        from fetchr import aria2_daemon
+
+        def fail_kill(pid, sig):
+            raise AssertionError("os.kill called on Windows")
+
+        monkeypatch.setattr(aria2_daemon.os, "name", "nt")
+        monkeypatch.setattr(aria2_daemon.os, "kill", fail_kill)
+        monkeypatch.setattr(aria2_daemon, "_pid_alive_windows", lambda pid: pid == 42)
+
+        assert aria2_daemon._pid_alive(42)
+        assert not aria2_daemon._pid_alive(43)
@@ -4,6 +4,8 @@ Tests for the health check system.
 These tests validate that the health check flow sequence
 works correctly for each supported host.
 """
+import asyncio
+import importlib
 import pytest
 from fetchr.health import (
     HealthChecker,
@@ -148,9 +150,112 @@ class TestHealthChecker:
         assert "pixeldrain" in results
 
 
+    async def test_checks_share_one_session(self):
+        """Test that every check in a run uses the checker's session."""
+        checker = HealthChecker(cache_ttl=0)
+        sessions = []
+        
+        for name, check in checker.checks.items():
+            async def fake_check(check=check):
+                sessions.append(check.session)
+                return HealthCheckResult(success=True, message="ok", host=check.host_name)
+            check.check = fake_check
+        
+        async with checker:
+            await checker.check_all()
+            await checker.check_hosts(["gofile", "pixeldrain"])
+        
+        assert len(sessions) == len(checker.checks) + 2
+        assert len({id(s) for s in sessions}) == 1
+        assert sessions[0].closed
+        assert all(check.session is None for check in checker.checks.values())
+
+    
+    async def test_slow_check_times_out(self):
+        """Test that a wedged host is cut off at the per-check timeout."""
+        checker = HealthChecker(per_check_timeout=0.05)
+        
+        async def wedged():
+            await asyncio.sleep(10)
+        checker.checks["gofile"].check = wedged
+        
+        result = await checker.check_host("gofile")
+        
+        assert result.success is False
+        assert "timed out" in result.message
+        assert result.host == "gofile.io"
+
+    
+    async def test_concurrent_checks_are_bounded(self):
+        """Test that no more than max_concurrent checks run at once."""
+        checker = HealthChecker(max_concurrent=2)
+        running = 0
+        peak = 0
+        
+        for check in checker.checks.values():
+            async def fake_check(check=check):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return HealthCheckResult(success=True, message="ok", host=check.host_name)
+            check.check = fake_check
+        
+        results = await checker.check_all()
+        
+        assert len(results) == len(checker.checks)
+        assert peak == 2
+
+    
+    async def test_results_are_cached_and_deduplicated(self):
+        """Test that concurrent and repeated calls share one check run."""
+        checker = HealthChecker()
+        calls = 0
+        
+        async def fake_check():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return HealthCheckResult(success=True, message="ok", host="gofile.io")
+        checker.checks["gofile"].check = fake_check
+        
+        first, second = await asyncio.gather(
+            checker.check_host("gofile"), checker.check_host("gofile")
+        )
+        third = await checker.check_host("gofile")
+        
+        assert calls == 1
+        assert first is second is third
+
+    
+    async def test_iter_check_all_yields_fastest_first(self):
+        """Test that results stream out in completion order."""
+        checker = HealthChecker(cache_ttl=0, max_concurrent=100)
+        
+        for delay, check in enumerate(checker.checks.values()):
+            async def fake_check(check=check, delay=delay):
+                await asyncio.sleep(0.05 * (len(checker.checks) - delay))
+                return HealthCheckResult(success=True, message="ok", host=check.host_name)
+            check.check = fake_check
+        
+        names = [name async for name, _ in checker.iter_check_all()]
+        
+        assert names == list(reversed(list(checker.checks)))
+
+
 class TestHealthFunctions:
     """Tests for the convenience health functions."""
     
+    def test_health_reuses_checker(self):
+        """Test that the sync wrapper keeps one checker between calls."""
+        health_module = importlib.import_module("fetchr.health")
+        
+        assert health("unknown_host_xyz") is False
+        checker = health_module._CHECKER
+        assert health("unknown_host_xyz") is False
+        assert health_module._CHECKER is checker
+    
     async def test_async_health_single(self):
         """Test async health check for single host."""
         result = await async_health("gofile")
@@ -0,0 +1,193 @@
+"""
+Tests for shared resolver helpers in fetchr.hosts.common.
+"""
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bs4 import SoupStrainer
+from fetchr.hosts.common import (
+    debug_dump,
+    extract_hidden_inputs,
+    filename_from_content_disposition,
+    filename_from_url,
+    find_link_href,
+    iter_form_inputs,
+    parse_html,
+    parse_tree_stream,
+    probe_content_length,
+)
+
+
+FORM_PAGE = """
+<html><body>
+<form method="POST" action=''>
+  <input type="hidden" name="op" value="download1">
+  <input type='hidden' name='id' value='abc123'>
+  <input type=hidden name=rand value="">
+  <input type="hidden" name="referer" value="https://a.com/?x=1&amp;y=2">
+  <input type="text" name="usr_login" value="">
+  <input type="hidden" data-value="nope" name="fname" value="file.zip">
+  <input type="submit" name="method_free" value="Free Download &gt;&gt;">
+</form>
+<form><input type="hidden" name="other" value="1"></form>
+</body></html>
+"""
+
+
+class TestParseHtml:
+    """Tests for parsing raw response bytes."""
+
+    @pytest.mark.parametrize("encoding", ["utf-8", "latin-1", "Shift_JIS", "euc_jp"])
+    def test_bytes_with_charset(self, encoding):
+        text = "é" if encoding == "latin-1" else "日本"
+        soup = parse_html(f"<p>{text}</p>".encode(encoding), encoding)
+        assert soup.p.get_text() == text
+
+    def test_parse_only(self):
+        html = b'<script>x()</script><div id="link"><a href="/f">f</a></div><p>ad</p>'
+        soup = parse_html(html, "utf-8", parse_only=SoupStrainer(id="link"))
+        assert soup.select_one("#link a")["href"] == "/f"
+        assert soup.find("script") is None and soup.find("p") is None
+
+
+class TestFindLinkHref:
+    """Tests for the XPath anchor lookup."""
+
+    @pytest.mark.parametrize("encoding", ["utf-8", "latin-1", "Shift_JIS", "euc_jp"])
+    def test_first_matching_anchor(self, encoding):
+        text = "é" if encoding == "latin-1" else "日本"
+        html = f'<a href="/a">{text}</a><a href="/b"><b>{text}</b> Download</a><a href="/c">Download</a>'
+        assert find_link_href(html.encode(encoding), "Download", encoding) == "/b"
+
+    def test_no_match(self):
+        assert find_link_href('<a href="/a">x</a>', "Download") is None
+
+
+class TestFilenames:
+    """Tests for filename extraction from URLs and headers."""
+
+    def test_from_url_drops_query(self):
+        assert filename_from_url("https://h.example/d/abc/file.part1.rar?token=x#y") == "file.part1.rar"
+
+    @pytest.mark.parametrize("value, expected", [
+        ('attachment; filename="a b.zip"', "a b.zip"),
+        ("attachment; filename=x.bin; size=3", "x.bin"),
+        ("attachment; filename*=UTF-8''%E6%97%A5%E6%9C%AC.rar", "日本.rar"),
+        ("attachment; filename=\"old.zip\"; filename*=UTF-8''new%20name.zip", "new name.zip"),
+        ("attachment; filename*=\"UTF-8''prasped.7z.004\"", "prasped.7z.004"),
+        ("attachment; FILENAME=upper.rar", "upper.rar"),
+        ("inline", None),
+        (None, None),
+    ])
+    def test_from_content_disposition(self, value, expected):
+        assert filename_from_content_disposition(value) == expected
+
+
+class TestParseTreeStream:
+    """Tests for the incremental lxml parse of a response body."""
+
+    @pytest.mark.parametrize("charset", ["utf-8", "latin-1", "Shift_JIS"])
+    async def test_streamed_page(self, charset):
+        text = "é" if charset == "latin-1" else "日本"
+        body = (f'<table><tr><td><a href="/{text}">x</a></td></tr></table>' * 2000).encode(charset)
+
+        async def page(request):
+            return web.Response(body=body, content_type="text/html", charset=charset)
+
+        app = web.Application()
+        app.router.add_get("/", page)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            async with session.get(server.make_url("/")) as response:
+                tree, raw = await parse_tree_stream(response, chunk_size=1000)
+
+        assert raw == body
+        assert tree.xpath("//table//a/@href")[0] == f"/{text}"
+
+
+class TestDebugDump:
+    """Tests for the env-gated page dumps."""
+
+    def test_noop_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("FETCHR_DEBUG_DUMP", raising=False)
+        debug_dump(str(tmp_path / "page.html"), "<html></html>")
+        assert not (tmp_path / "page.html").exists()
+
+    def test_writes_when_enabled(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("FETCHR_DEBUG_DUMP", "1")
+        debug_dump(str(tmp_path / "page.html"), "<p>é</p>")
+        debug_dump(str(tmp_path / "raw.html"), b"\xff")
+        assert (tmp_path / "page.html").read_text(encoding="utf-8") == "<p>é</p>"
+        assert (tmp_path / "raw.html").read_bytes() == b"\xff"
+
+
+class TestExtractHiddenInputs:
+    """Tests for the regex form scanner."""
+
+    def test_matches_soup_extraction(self):
+        """Same result as walking the parsed first form."""
+        form = parse_html(FORM_PAGE).find('form')
+        expected = {
+            i.get('name'): i.get('value', '')
+            for i in form.find_all('input', type='hidden')
+        }
+        assert extract_hidden_inputs(FORM_PAGE) == expected
+        assert expected["referer"] == "https://a.com/?x=1&y=2"
+
+    def test_non_hidden_inputs_are_yielded(self):
+        submit = [a for a in iter_form_inputs(FORM_PAGE) if a.get('name') == 'method_free']
+        assert submit == [{'type': 'submit', 'name': 'method_free', 'value': 'Free Download >>'}]
+
+    def test_no_form_raises(self):
+        with pytest.raises(ValueError):
+            extract_hidden_inputs("<html><body>nothing</body></html>")
+
+
+class TestProbeContentLength:
+    """Tests for the ranged GET size probe."""
+
+    @pytest.fixture
+    async def server(self):
+        body = b"x" * 1000
+
+        async def ranged(request):
+            if request.headers.get("Range") == "bytes=0-0":
+                return web.Response(status=206, body=body[:1], headers={"Content-Range": "bytes 0-0/1000"})
+            return web.Response(body=body)
+
+        async def plain(request):
+            return web.Response(body=body)
+
+        async def redirect(request):
+            raise web.HTTPFound("/ranged")
+
+        methods = []
+
+        @web.middleware
+        async def record(request, handler):
+            methods.append(request.method)
+            return await handler(request)
+
+        app = web.Application(middlewares=[record])
+        app.router.add_get("/ranged", ranged)
+        app.router.add_get("/plain", plain)
+        app.router.add_get("/redirect", redirect)
+        async with TestServer(app) as server:
+            server.methods = methods
+            yield server
+
+    @pytest.mark.parametrize("path", ["/ranged", "/plain", "/redirect"])
+    async def test_reports_total_size(self, server, path):
+        async with aiohttp.ClientSession() as session:
+            size, headers = await probe_content_length(session, str(server.make_url(path)))
+
+        assert size == 1000
+        assert headers["Content-Length"] == "1000"
+        assert "Content-Range" not in headers
+
+    async def test_missing_skips_head(self, server):
+        async with aiohttp.ClientSession() as session:
+            size, _ = await probe_content_length(session, str(server.make_url("/missing")))
+
+        assert size is None
+        assert server.methods == ["GET"]
@@ -0,0 +1,68 @@
+"""
+Tests for fetchr network helpers.
+"""
+import os
+from fetchr.network import (
+    aclose_shared_session,
+    create_session,
+    get_shared_connector,
+    get_shared_session,
+)
+
+
+class TestSharedConnector:
+    """Tests for the process-wide connection pool."""
+
+    async def test_sessions_share_connector(self):
+        """Closing a session leaves the pooled connector open."""
+        first = create_session()
+        second = create_session(headers={"X-Test": "1"})
+        try:
+            assert first.connector is second.connector is get_shared_connector()
+            assert get_shared_session().connector is first.connector
+        finally:
+            await first.close()
+            await second.close()
+
+        assert not get_shared_connector().closed
+        await aclose_shared_session()
+
+    async def test_shared_session_keeps_no_cookies(self):
+        """Resolvers share the session, so cookies must not leak between them."""
+        import aiohttp
+        assert isinstance(get_shared_session().cookie_jar, aiohttp.DummyCookieJar)
+        await aclose_shared_session()
+
+    async def test_aclose_shared_session(self):
+        session = get_shared_session()
+        connector = get_shared_connector()
+
+        await aclose_shared_session()
+
+        assert session.closed
+        assert connector.closed
+        assert get_shared_connector() is not connector
+        await aclose_shared_session()
+
+
+class TestProxies:
+    """Tests for the proxies file reader."""
+
+    def test_reread_only_on_change(self, tmp_path, monkeypatch):
+        from fetchr.network import proxy
+
+        path = tmp_path / "proxies.txt"
+        path.write_text("1.2.3.4:80\n\n")
+        monkeypatch.setattr(proxy, "PROXIES_PATH", path)
+        monkeypatch.setattr(proxy, "_proxies_cache", (False, []))
+
+        assert proxy.get_proxies() == ["http://1.2.3.4:80"]
+        assert proxy.get_random_proxy() == "http://1.2.3.4:80"
+
+        path.write_text("5.6.7.8:8080\n")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert proxy.get_proxies() == ["http://5.6.7.8:8080"]
+
+        path.unlink()
+        assert proxy.get_random_proxy() is None
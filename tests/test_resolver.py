@@ -0,0 +1,189 @@
+"""
+Tests for the debrid gateway resolvers, the passthrough resolver and the
+GoFile token cache.
+"""
+import time
+import orjson
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fetchr import resolver
+from fetchr.hosts.gofile import _GoFileTokenManager
+from fetchr.hosts.krakenfiles import KrakenFilesResolver
+from fetchr.hosts.passtrought import PassThroughResolver
+from fetchr.network import aclose_shared_session
+
+
+@pytest.fixture
+async def gateway(monkeypatch):
+    methods = []
+
+    def answer(request, target):
+        data = {"url": str(request.url.with_path("/file").with_query({}))}
+        if "known" in target:
+            data.update(filename="known.bin", filesize=1000)
+        return data
+
+    async def resolve(request):
+        methods.append("resolve")
+        return web.json_response(answer(request, request.query["url"]))
+
+    async def resolve_batch(request):
+        if not server.batch:
+            raise web.HTTPNotFound()
+        methods.append("resolve_batch")
+        return web.json_response([answer(request, url) for url in await request.json()])
+
+    async def file(request):
+        methods.append(request.method)
+        return web.Response(headers={
+            "Content-Length": "10",
+            "Content-Disposition": 'attachment; filename="probed.bin"',
+        })
+
+    app = web.Application()
+    app.router.add_get("/resolve/", resolve)
+    app.router.add_post("/resolve_batch/", resolve_batch)
+    app.router.add_route("HEAD", "/file", file)
+    async with TestServer(app) as server:
+        monkeypatch.setattr(resolver, "DEBRID_GATEWAY", str(server.make_url("")).rstrip("/"))
+        server.methods = methods
+        server.batch = True
+        yield server
+    await aclose_shared_session()
+
+
+class TestGatewayResolve:
+    """Tests for resolving through the debrid gateway."""
+
+    async def test_gateway_metadata_skips_head(self, gateway):
+        async with KrakenFilesResolver() as r:
+            info = await r.get_download_info("https://krakenfiles.com/view/known")
+
+        assert (info.filename, info.size) == ("known.bin", 1000)
+        assert gateway.methods == ["resolve"]
+
+    async def test_falls_back_to_head(self, gateway):
+        async with KrakenFilesResolver() as r:
+            info = await r.get_download_info("https://krakenfiles.com/view/other")
+
+        assert (info.filename, info.size) == ("probed.bin", 10)
+        assert gateway.methods == ["resolve", "HEAD"]
+
+    async def test_batch_single_request(self, gateway):
+        """The whole batch is resolved by one gateway call."""
+        urls = ["https://krakenfiles.com/view/known", "https://krakenfiles.com/view/other"]
+        async with KrakenFilesResolver() as r:
+            infos = await r.get_download_info_batch(urls)
+
+        assert [i.filename for i in infos] == ["known.bin", "probed.bin"]
+        assert gateway.methods == ["resolve_batch", "HEAD"]
+
+    async def test_batch_without_endpoint(self, gateway):
+        """Gateways without /resolve_batch/ get one /resolve/ per url."""
+        gateway.batch = False
+        urls = ["https://krakenfiles.com/view/known", "https://krakenfiles.com/view/known2"]
+        async with KrakenFilesResolver() as r:
+            infos = await r.get_download_info_batch(urls)
+
+        assert [i.filename for i in infos] == ["known.bin", "known.bin"]
+        assert gateway.methods == ["resolve", "resolve"]
+
+
+class TestPassThrough:
+    """Tests for the header-only probe of direct links."""
+
+    @pytest.fixture
+    async def server(self):
+        requests = []
+
+        async def file(request):
+            requests.append((request.method, request.headers.get("Range")))
+            if request.method == "HEAD" and request.path == "/presigned":
+                raise web.HTTPForbidden()
+            if request.method == "HEAD" and request.path != "/file":
+                raise web.HTTPMethodNotAllowed("HEAD", ["GET"])
+            if request.path == "/broken":
+                raise web.HTTPInternalServerError()
+            headers = {"content-disposition": 'attachment; filename="a.bin"'}
+            if request.headers.get("Range") == "bytes=0-0":
+                total = "*" if request.path == "/unknown" else "5000"
+                headers["Content-Range"] = f"bytes 0-0/{total}"
+                return web.Response(status=206, body=b"x", headers=headers)
+            return web.Response(body=b"x" * 5000, headers=headers)
+
+        async def redirect(request):
+            raise web.HTTPFound("/file")
+
+        app = web.Application()
+        app.router.add_route("*", "/file", file)
+        app.router.add_route("*", "/nohead", file)
+        app.router.add_route("*", "/unknown", file)
+        app.router.add_route("*", "/presigned", file)
+        app.router.add_route("*", "/broken", file)
+        app.router.add_get("/redirect", redirect)
+        async with TestServer(app) as server:
+            server.requests = requests
+            yield server
+        await aclose_shared_session()
+
+    async def test_head_follows_redirects(self, server):
+        async with PassThroughResolver() as r:
+            info = await r.get_download_info(str(server.make_url("/redirect")))
+
+        assert info.download_url == str(server.make_url("/file"))
+        assert (info.filename, info.size) == ("a.bin", 5000)
+        assert server.requests == [("HEAD", None)]
+
+    async def test_ranged_get_when_head_not_allowed(self, server):
+        async with PassThroughResolver() as r:
+            info = await r.get_download_info(str(server.make_url("/nohead")))
+
+        assert (info.filename, info.size) == ("a.bin", 5000)
+        assert server.requests == [("HEAD", None), ("GET", "bytes=0-0")]
+
+    async def test_unknown_total_degrades(self, server):
+        """A "bytes 0-0/*" total gives size 0 instead of an error."""
+        async with PassThroughResolver() as r:
+            info = await r.get_download_info(str(server.make_url("/unknown")))
+
+        assert (info.filename, info.size) == ("a.bin", 0)
+        # No second HEAD: the server already refused it
+        assert server.requests == [("HEAD", None), ("GET", "bytes=0-0")]
+
+    async def test_ranged_get_when_head_forbidden(self, server):
+        """Presigned URLs can reject HEAD with 403 and still serve GET."""
+        async with PassThroughResolver() as r:
+            info = await r.get_download_info(str(server.make_url("/presigned")))
+
+        assert (info.filename, info.size) == ("a.bin", 5000)
+
+    async def test_ranged_get_error_raises(self, server):
+        async with PassThroughResolver() as r:
+            with pytest.raises(Exception, match="status code: 500"):
+                await r.get_download_info(str(server.make_url("/broken")))
+
+
+class TestGoFileTokenCache:
+    """Tests for the on-disk GoFile token cache."""
+
+    async def test_token_reused_across_managers(self, tmp_path):
+        """A fresh manager (next run) picks up the saved token without a request."""
+        cache_path = tmp_path / "gofile.token"
+        _GoFileTokenManager(cache_path=cache_path)._save_token("abc")
+
+        manager = _GoFileTokenManager(base_url="http://127.0.0.1:9", cache_path=cache_path)
+        assert await manager.get_token() == "abc"
+        await aclose_shared_session()
+
+    def test_expired_token_ignored(self, tmp_path):
+        cache_path = tmp_path / "gofile.token"
+        cache_path.write_bytes(orjson.dumps({"token": "abc", "ts": time.time() - 7200}))
+
+        assert _GoFileTokenManager(cache_path=cache_path)._load_cached_token() is None
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        cache_path = tmp_path / "gofile.token"
+        cache_path.write_bytes(b"not json")
+
+        assert _GoFileTokenManager(cache_path=cache_path)._load_cached_token() is None